@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds then aren't serialised across processes
+    fcntl = None
+
+from flask import current_app
+
+# One cached responses ZIP per assignment, next to a manifest recording which
+# (submission id, file mtime, size) went into it:
+#   - same manifest            -> served as is
+#   - only new submissions     -> copy the cached ZIP and append the new files
+#   - anything changed/removed -> rebuild from scratch
+# Files are replaced atomically, so a download in progress in another worker
+# keeps reading the old copy.
+
+
+def init_app(app):
+    app.config.setdefault('ARCHIVE_CACHE_DIR', os.path.join(app.instance_path, 'archive_cache'))
+    app.config.setdefault('ARCHIVE_CACHE_MAX_BYTES', int(os.environ.get('ARCHIVE_CACHE_MAX_BYTES', 512 * 1024 * 1024)))
+    os.makedirs(app.config['ARCHIVE_CACHE_DIR'], exist_ok=True)
+
+
+def archive_name(assignment_id):
+    return f"responses_{assignment_id}.zip"
+
+
+def _paths(assignment_id):
+    cache_dir = current_app.config['ARCHIVE_CACHE_DIR']
+    base = os.path.join(cache_dir, archive_name(assignment_id))
+    return cache_dir, base, base + '.json'
+
+
+def current_manifest(submissions):
+    """{submission id: [path, mtime_ns, size, arcname]} for the files that exist right now."""
+    manifest = {}
+    for sub in submissions:
+        if not sub.submission_file:
+            continue
+        try:
+            st = os.stat(sub.submission_file)
+        except OSError:
+            continue
+        manifest[str(sub.id)] = [sub.submission_file, st.st_mtime_ns, st.st_size, os.path.basename(sub.submission_file)]
+    return manifest
+
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def _locked(lock_path):
+    with open(lock_path, 'a') as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _append_entries(zf, entries):
+    from archive_stream import compress_type_for
+    for path, _, _, arcname in entries:
+        zf.write(path, arcname=arcname, compress_type=compress_type_for(path))
+
+
+def _replace(cache_dir, archive_path, manifest_path, manifest, fill):
+    """Produce a new archive in a temp file with `fill(tmp_path)` then swap it and its manifest in."""
+    fd, tmp_zip = tempfile.mkstemp(dir=cache_dir, suffix='.zip.tmp')
+    os.close(fd)
+    try:
+        fill(tmp_zip)
+        with tempfile.NamedTemporaryFile('w', dir=cache_dir, suffix='.json.tmp', delete=False) as tmp_manifest:
+            json.dump(manifest, tmp_manifest)
+        os.replace(tmp_zip, archive_path)
+        os.replace(tmp_manifest.name, manifest_path)
+    finally:
+        if os.path.exists(tmp_zip):
+            os.remove(tmp_zip)
+
+
+def is_fresh(assignment_id, submissions):
+    """True when the cached archive already matches `submissions` and can be served as is."""
+    _, archive_path, manifest_path = _paths(assignment_id)
+    if not os.path.exists(archive_path):
+        return False
+    if _read_manifest(manifest_path) != current_manifest(submissions):
+        return False
+    os.utime(manifest_path)   # recently used, for eviction
+    return True
+
+
+def get_archive(assignment_id, submissions):
+    """Bring the cached archive for an assignment up to date.
+
+    Returns (filename inside ARCHIVE_CACHE_DIR, 'hit' | 'append' | 'build').
+    """
+    import zipfile   # zip code loads with the first archive build, not at app start
+    from archive_stream import iter_zip
+
+    cache_dir, archive_path, manifest_path = _paths(assignment_id)
+    wanted = current_manifest(submissions)
+
+    with _locked(archive_path + '.lock'):
+        cached = _read_manifest(manifest_path) if os.path.exists(archive_path) else None
+
+        if cached == wanted:
+            os.utime(manifest_path)   # recently used, for eviction
+            return archive_name(assignment_id), 'hit'
+
+        if cached is not None and all(wanted.get(key) == entry for key, entry in cached.items()):
+            new_entries = [entry for key, entry in wanted.items() if key not in cached]
+
+            def fill(tmp_path):
+                shutil.copyfile(archive_path, tmp_path)
+                with zipfile.ZipFile(tmp_path, 'a') as zf:
+                    _append_entries(zf, new_entries)
+            status = 'append'
+        else:
+            def fill(tmp_path):
+                with open(tmp_path, 'wb') as f:
+                    for chunk in iter_zip((path, arcname) for path, _, _, arcname in wanted.values()):
+                        f.write(chunk)
+            status = 'build'
+
+        _replace(cache_dir, archive_path, manifest_path, wanted, fill)
+
+    evict(keep=archive_path)
+    return archive_name(assignment_id), status
+
+
+def evict(keep=None):
+    """Delete least recently used archives until the cache fits ARCHIVE_CACHE_MAX_BYTES."""
+    cache_dir = current_app.config['ARCHIVE_CACHE_DIR']
+    budget = current_app.config['ARCHIVE_CACHE_MAX_BYTES']
+    archives = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith('.zip'):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            size = os.path.getsize(path)
+            used = os.path.getmtime(path + '.json') if os.path.exists(path + '.json') else os.path.getmtime(path)
+        except OSError:
+            continue
+        archives.append((used, path, size))
+
+    total = sum(size for _, _, size in archives)
+    for _, path, size in sorted(archives):
+        if total <= budget:
+            break
+        if path == keep:
+            continue
+        # the .lock file stays: another worker may be holding it
+        for stale in (path, path + '.json'):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+        total -= size
@@ -0,0 +1,70 @@
+import os
+import zipfile
+
+# Formats that are already compressed; deflating them again only burns CPU.
+STORED_EXTENSIONS = {
+    '.pdf', '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic',
+    '.mp3', '.mp4', '.m4a', '.mov', '.avi', '.mkv',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp', '.epub',
+}
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _Sink:
+    """Write-only, non-seekable file object that hands its bytes back to the generator.
+
+    zipfile notices it can't seek and writes data descriptors after each entry
+    instead of going back to patch the local headers.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def compress_type_for(path):
+    ext = os.path.splitext(path)[1].lower()
+    return zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+def iter_zip(entries, chunk_size=CHUNK_SIZE):
+    """Yield a ZIP archive of `entries` ((path, arcname) pairs) piece by piece.
+
+    Memory stays around one chunk per file regardless of archive size and nothing
+    is written to disk. Missing files are skipped.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w') as zf:
+        for path, arcname in entries:
+            if not path or not os.path.isfile(path):
+                continue
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = compress_type_for(path)
+            with open(path, 'rb') as src, zf.open(info, 'w') as dest:
+                while True:
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # central directory, written when the ZipFile closes
+    yield sink.drain()
+
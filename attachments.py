@@ -0,0 +1,97 @@
+import mimetypes
+import os
+from urllib.parse import quote
+
+from flask import abort, current_app, request
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+
+# How attachment bytes leave the app, set with ATTACHMENT_OFFLOAD:
+#   ''            Python streams the file itself (Range, ETag, 304 all handled here)
+#   'x-accel'     nginx: respond with X-Accel-Redirect and let the proxy send the file.
+#                 Every directory files are served from needs its own internal location,
+#                 listed in ATTACHMENT_ACCEL_PREFIXES ({config key of the directory: prefix}):
+#                     location /protected_uploads/ { internal; alias /srv/portal/uploads/; }
+#                     location /protected_archives/ { internal; alias /srv/portal/instance/archive_cache/; }
+#                     location /protected_exports/ { internal; alias /srv/portal/instance/exports/; }
+#                 Files from a directory without a prefix are streamed by Python instead.
+#   'x-sendfile'  Apache mod_xsendfile / lighttpd: respond with X-Sendfile <absolute path>
+# In both offload modes the worker returns immediately; the proxy does Range requests.
+OFFLOAD_MODES = ('', 'x-accel', 'x-sendfile')
+
+
+def init_app(app):
+    app.config.setdefault('ATTACHMENT_OFFLOAD', os.environ.get('ATTACHMENT_OFFLOAD', '').lower())
+    app.config.setdefault('ATTACHMENT_ACCEL_PREFIX', os.environ.get('ATTACHMENT_ACCEL_PREFIX', '/protected_uploads/'))
+    app.config.setdefault('ATTACHMENT_ACCEL_PREFIXES', {
+        'UPLOAD_FOLDER': app.config['ATTACHMENT_ACCEL_PREFIX'],
+        'ARCHIVE_CACHE_DIR': os.environ.get('ATTACHMENT_ACCEL_ARCHIVE_PREFIX', '/protected_archives/'),
+        'EXPORT_DIR': os.environ.get('ATTACHMENT_ACCEL_EXPORT_PREFIX', '/protected_exports/'),
+    })
+    app.config.setdefault('ATTACHMENT_MAX_AGE', int(os.environ.get('ATTACHMENT_MAX_AGE', 3600)))
+    if app.config['ATTACHMENT_OFFLOAD'] not in OFFLOAD_MODES:
+        raise ValueError(f"ATTACHMENT_OFFLOAD must be one of {OFFLOAD_MODES}")
+
+
+def file_etag(stat):
+    # strong validator: changes whenever the file is replaced or rewritten
+    return f"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def accel_prefix(config, directory):
+    """The X-Accel-Redirect prefix nginx maps onto `directory`, or None when there is none."""
+    directory = os.path.abspath(directory)
+    for key, prefix in config['ATTACHMENT_ACCEL_PREFIXES'].items():
+        if config.get(key) and os.path.abspath(config[key]) == directory:
+            return prefix
+    return None
+
+
+def serve_attachment(filename, download_name=None, as_attachment=True, directory=None):
+    """Send a file from the uploads folder with Range/ETag/cache support or hand it to the proxy."""
+    config = current_app.config
+    directory = directory or config['UPLOAD_FOLDER']
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    stat = os.stat(path)
+    download_name = download_name or os.path.basename(path)
+    mimetype = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+    mode = config['ATTACHMENT_OFFLOAD']
+    prefix = accel_prefix(config, directory) if mode == 'x-accel' else None
+    if mode == 'x-accel' and prefix is None:
+        mode = ''   # no internal location for this directory: nginx couldn't find the file
+
+    offload = mode in ('x-accel', 'x-sendfile')
+    response = send_file(
+        path,
+        request.environ,
+        mimetype=mimetype,
+        as_attachment=as_attachment,
+        download_name=download_name,
+        conditional=not offload,
+        etag=file_etag(stat),
+        last_modified=stat.st_mtime,
+        max_age=config['ATTACHMENT_MAX_AGE'],
+        use_x_sendfile=offload,
+        response_class=current_app.response_class,
+    )
+    # attachments can be per-group, so keep them out of shared caches
+    response.cache_control.public = False
+    response.cache_control.private = True
+    if not offload:
+        response.accept_ranges = 'bytes'
+
+    if offload:
+        # the proxy serves the bytes (and any Range); we still answer revalidation with 304
+        response = response.make_conditional(request.environ)
+        sendfile_path = response.headers.pop('X-Sendfile', None)
+        if response.status_code == 304:
+            pass
+        elif mode == 'x-accel':
+            relative = os.path.relpath(path, directory).replace(os.sep, '/')
+            response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(relative)
+        elif sendfile_path:
+            response.headers['X-Sendfile'] = sendfile_path
+    return response
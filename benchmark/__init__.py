@@ -0,0 +1,20 @@
+"""Large synthetic cohorts and a per-route latency benchmark.
+
+    python -m benchmark.generate --students 2000 --years 2      # builds instance/benchmark/
+    python -m benchmark.run --out bench-$(git rev-parse --short HEAD).json
+    python -m benchmark.run --compare bench-<old>.json
+
+Both point the app at the generated data through DATABASE_URL / UPLOAD_FOLDER,
+so the real database and uploads/ are never touched.
+"""
+import os
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'benchmark')
+
+
+def use_dataset(directory):
+    """Point app.py at a generated dataset. Must run before create_app() is called."""
+    directory = os.path.abspath(directory)
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(directory, 'portal.db')
+    os.environ['UPLOAD_FOLDER'] = os.path.join(directory, 'uploads')
+    return directory
@@ -0,0 +1,145 @@
+"""Measure how long a fresh process takes to import app.py and build the app.
+
+Each run is a new interpreter (what a gunicorn worker or a `flask` command
+pays) started with -X importtime; the report shows the median import and
+create_app() time, and the modules that cost the most. It fails when one of
+HEAVY_MODULES got loaded at boot or, with --max-ms, when boot got slower.
+
+    python -m benchmark.coldstart
+    python -m benchmark.coldstart --runs 20 --max-ms 600 --out coldstart.json
+    python -m benchmark.coldstart --compare coldstart.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmark.run import git_commit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# only needed to produce downloads; they must be imported inside the views/jobs that use them.
+# (zipfile itself isn't listed: Flask loads it through importlib.metadata anyway,
+# archive_stream stands in for the ZIP building code.)
+HEAVY_MODULES = ('reportlab', 'numpy', 'openpyxl', 'multiprocessing', 'register', 'roster_import', 'archive_stream')
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_ms': (created - imported) * 1000,
+    'heavy': [name for name in sys.argv[1:] if name in sys.modules],
+}))
+"""
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters to start')
+    parser.add_argument('--top', type=int, default=15, help='slowest modules to list')
+    parser.add_argument('--max-ms', type=float, help='fail when median import + create_app() exceeds this')
+    parser.add_argument('--out', help='write results as JSON here')
+    parser.add_argument('--compare', help='earlier results JSON to diff against')
+    return parser.parse_args(argv)
+
+
+def parse_importtime(stderr):
+    """{module: cumulative microseconds} for the modules app.py imports directly."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # app.py's own imports are nested exactly one level below it
+        if name.startswith('   ') and not name.startswith('    '):
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def sample(workdir):
+    env = dict(os.environ,
+               DATABASE_URL='sqlite:///' + os.path.join(workdir, 'coldstart.db'),
+               UPLOAD_FOLDER=os.path.join(workdir, 'uploads'))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD, *HEAVY_MODULES],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        sys.exit(proc.stderr)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['modules'] = parse_importtime(proc.stderr)
+    return result
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as workdir:
+        samples = [sample(workdir) for _ in range(args.runs)]
+
+    boot = sorted(s['import_ms'] + s['create_ms'] for s in samples)
+    modules = {}
+    for s in samples:
+        for name, us in s['modules'].items():
+            modules.setdefault(name, []).append(us / 1000)
+    slowest = sorted(((name, statistics.median(ms)) for name, ms in modules.items()), key=lambda m: -m[1])
+    heavy = sorted({name for s in samples for name in s['heavy']})
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runs': args.runs,
+        },
+        'import_ms': round(statistics.median(s['import_ms'] for s in samples), 1),
+        'create_app_ms': round(statistics.median(s['create_ms'] for s in samples), 1),
+        'boot_ms': round(statistics.median(boot), 1),
+        'boot_min_ms': round(boot[0], 1),
+        'heavy_modules_loaded': heavy,
+        'modules_ms': {name: round(ms, 1) for name, ms in slowest[:args.top]},
+    }
+
+    print(f"import app      {report['import_ms']:>8.1f} ms (median of {args.runs})")
+    print(f"create_app()    {report['create_app_ms']:>8.1f} ms")
+    print(f"boot            {report['boot_ms']:>8.1f} ms (best {report['boot_min_ms']:.1f} ms)")
+    print("\nSlowest imports (cumulative):")
+    for name, ms in report['modules_ms'].items():
+        print(f"  {name:<28} {ms:>8.1f} ms")
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results written to {args.out}")
+    if args.compare:
+        compare(args.compare, report)
+
+    failures = []
+    if heavy:
+        failures.append(f"loaded at boot: {', '.join(heavy)} (import them inside the function that needs them)")
+    if args.max_ms is not None and report['boot_ms'] > args.max_ms:
+        failures.append(f"boot took {report['boot_ms']:.1f} ms, budget is {args.max_ms:.0f} ms")
+    for failure in failures:
+        print(f"❌ {failure}")
+    return report, failures
+
+
+def compare(baseline_path, report):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline['meta'].get('commit') or baseline_path}:")
+    for key in ('import_ms', 'create_app_ms', 'boot_ms'):
+        before, after = baseline[key], report[key]
+        print(f"  {key:<14} {before:.1f} -> {after:.1f} ({(after - before) / before * 100:+.0f}%)")
+
+
+if __name__ == '__main__':
+    _, failures = run(parse_args())
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,336 @@
+"""Drive every route through the Flask test client and report latency per route.
+
+Each scenario is one request as a logged-in role (session set up outside the
+timed part). Destructive routes (delete_*, delete_everything, roster import)
+and POSTs that would grow the data on every iteration (creating students,
+subjects, professors, assignments and announcements) are left out; their GET
+pages are measured.
+
+Query budgets are enforced, so a view over its @query_budget answers 500 and
+shows up under errors, as does a scenario answering something other than the
+status it expects. Errors count every request, warmup included, and each
+scenario starts with cold identity and reference caches, so a regression that
+only hits a worker's first request is caught too. Export jobs are queued but
+not run, except one finished job used by the job status/download scenarios;
+response archives are cached in a temporary directory for the run.
+"""
+import argparse
+import atexit
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmark import DEFAULT_DIR, use_dataset
+from fixtures import COHORT_PASSWORD as PASSWORD
+
+ROLE_KEYS = {'student': 'student_roll', 'cr': 'student_roll', 'professor': 'prof_id', 'admin': 'admin_username'}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default=DEFAULT_DIR, help='dataset made by benchmark.generate')
+    parser.add_argument('--iterations', type=int, default=30, help='timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=3, help='untimed requests per scenario first')
+    parser.add_argument('--only', default='', help='comma separated scenario names')
+    parser.add_argument('--out', help='write results as JSON here')
+    parser.add_argument('--compare', help='earlier results JSON to diff against')
+    return parser.parse_args(argv)
+
+
+# ----------------- SCENARIOS -----------------
+def fixtures():
+    """Ids the scenarios need, picked from the generated data."""
+    from sqlalchemy import func
+    from models import (db, Student, Professor, Subject, AttendanceSession, Assignment, AssignmentSubmission,
+                        Announcement, AnnouncementGroup)
+
+    student = Student.query.filter_by(is_cr=False).order_by(Student.id).first()
+    cr = Student.query.filter_by(is_cr=True).order_by(Student.id).first()
+    theory = (AttendanceSession.query.filter_by(group_flag='ALL')
+              .order_by(AttendanceSession.date.desc()).first())
+    busiest = (db.session.query(AssignmentSubmission.assignment_id)
+               .filter(AssignmentSubmission.submission_file.isnot(None))
+               .group_by(AssignmentSubmission.assignment_id)
+               .order_by(func.count().desc()).limit(1).scalar())
+    assignment = db.session.get(Assignment, busiest) if busiest else Assignment.query.first()
+    return {
+        'student': student,
+        'cr': cr,
+        'professor': Professor.query.order_by(Professor.id).first(),
+        'subject': Subject.query.order_by(Subject.id).first(),
+        'session': theory,
+        'assignment': assignment,
+        'announcement': Announcement.query.filter(Announcement.filename.isnot(None)).first(),
+        'group_announcement': AnnouncementGroup.query.filter(AnnouncementGroup.filename.isnot(None),
+                                                             AnnouncementGroup.group == student.group).first(),
+        'present_ids': [s.id for s in Student.query.order_by(Student.id).all()][::2],
+    }
+
+
+def finished_job(app, owner, subject_id):
+    """Queue one register PDF and run it here, for the job status/download scenarios."""
+    import jobs
+
+    job = jobs.enqueue('register_pdf', {'subject_id': subject_id, 'date_from': None, 'date_to': None,
+                                        'group': None}, owner=owner)
+    jobs.work(app, once=True)
+    return job.id
+
+
+def cached_archive(assignment_id):
+    """Scenario setup: make sure the responses ZIP is cached, so the request is a cache hit."""
+    def setup():
+        import archive_cache
+        from models import AssignmentSubmission
+        archive_cache.get_archive(assignment_id, AssignmentSubmission.query.filter_by(assignment_id=assignment_id).all())
+    return setup
+
+
+def drop_queued_jobs():
+    """Remove the jobs the PDF scenarios queued; nothing runs them during a benchmark."""
+    from models import db, ExportJob
+    ExportJob.query.filter_by(status='queued').delete()
+    db.session.commit()
+
+
+def scenarios(f):
+    s, cr, prof, sess, a = f['student'], f['cr'], f['professor'], f['session'], f['assignment']
+    subject, job_id = sess.subject_id, f['job_id']
+    report_form = {'professor': sess.professor_id, 'subject': sess.subject_id,
+                   'date': sess.date.isoformat(), 'subject_type': sess.subject_type}
+    mark_form = {'subject': sess.subject_id, 'professor': sess.professor_id, 'date': sess.date.isoformat(),
+                 'subject_type': sess.subject_type, 'group_choice': 'ALL', 'present_students': f['present_ids']}
+    response_form = {'professor_id': a.professor_id, 'assignment_id': a.id}
+    admin = ('admin', 'admin01')
+    student = ('student', s.roll)
+    professor = ('professor', prof.prof_id)
+    return [
+        # name, role, method, path, form data (callable for fresh file objects)[, options]
+        # options: 'expect' = the status every response must have,
+        #          'setup' = called (untimed, in an app context) before each request
+        ('home', None, 'GET', '/', None),
+        ('login_student_page', None, 'GET', '/login_student', None),
+        ('login_student', None, 'POST', '/login_student', {'roll': s.roll, 'password': PASSWORD}),
+        ('login_professor', None, 'POST', '/login_professor', {'prof_id': prof.prof_id, 'password': PASSWORD}),
+        ('login_admin', None, 'POST', '/login_admin', {'username': 'admin01', 'password': PASSWORD}),
+        ('logout', student, 'GET', '/logout', None),
+        ('dashboard_student', student, 'GET', '/dashboard_student', None),
+        ('dashboard_professor', professor, 'GET', '/dashboard_professor', None),
+        ('dashboard_admin', admin, 'GET', '/dashboard_admin', None),
+        ('manage_students', admin, 'GET', '/admin/manage_students', None),
+        ('edit_student_page', admin, 'GET', f'/admin/edit_student/{s.id}', None),
+        ('manage_subjects', admin, 'GET', '/admin/manage_subjects', None),
+        ('edit_subject', admin, 'GET', f"/admin/edit_subject/{f['subject'].id}", None),
+        ('manage_professors', admin, 'GET', '/admin/manage_professors', None),
+        ('edit_professor_page', admin, 'GET', f'/admin/edit_professor/{prof.id}', None),
+        ('attendance_view', student, 'GET', '/attendance/view', None),
+        ('attendance_view_admin', admin, 'GET', f'/attendance/view/{s.id}', None),
+        ('attendance_mark_page', ('cr', cr.roll), 'GET', '/attendance/mark', None),
+        ('attendance_mark', ('cr', cr.roll), 'POST', '/attendance/mark', mark_form),
+        ('attendance_report_page', professor, 'GET', '/attendance/report', None),
+        ('attendance_report', professor, 'POST', '/attendance/report', report_form),
+        ('attendance_report_pdf', professor, 'POST', '/attendance/report', dict(report_form, download='1'),
+         {'expect': 303}),
+        ('attendance_edit_page', admin, 'GET', '/attendance/edit', None),
+        ('attendance_edit_search', admin, 'POST', '/attendance/edit', dict(report_form, search='1')),
+        ('assignments_create_page', professor, 'GET', '/assignments_create', None),
+        ('assignments_view', student, 'GET', '/assignments_view', None),
+        ('upload_assignment', student, 'POST', f'/assignments/{a.id}/upload',
+         lambda: {'file': (io.BytesIO(b'benchmark upload\n' * 256), 'answer.txt')}),
+        ('assignments_edit_page', professor, 'GET', '/assignments_edit', None),
+        ('assignments_edit', professor, 'POST', '/assignments_edit',
+         {'professor_id': a.professor_id, 'subject_id': a.subject_id, 'assignment_id': a.id}),
+        ('assignments_mark_page', ('cr', cr.roll), 'GET', '/assignments_mark', None),
+        ('assignments_mark', ('cr', cr.roll), 'POST', '/assignments_mark',
+         {'professor': a.professor_id, 'assignment': a.id}),
+        ('assignments_response_page', professor, 'GET', '/assignments_response', None),
+        ('assignments_response', professor, 'POST', '/assignments_response', response_form, {'expect': 303}),
+        ('assignments_response_cached', professor, 'POST', '/assignments_response', response_form,
+         {'expect': 200, 'setup': cached_archive(a.id)}),
+        ('announcement_create_page', admin, 'GET', '/admin/announcement_create', None),
+        ('announcement_view', student, 'GET', '/announcement_view', None),
+        ('announcement_download', student, 'GET', f"/announcement_download/{f['announcement'].id}", None,
+         {'expect': 200}),
+        ('announcement_group_create_page', ('cr', cr.roll), 'GET', '/announcement_group_create', None),
+        ('announcement_group_view', student, 'GET', f'/announcement_group_view/{s.group}', None),
+        ('announcement_group_download', student, 'GET',
+         f"/announcement_group_download/{f['group_announcement'].id}", None, {'expect': 200}),
+        ('reports_page', professor, 'GET', '/reports', None),
+        ('reports', professor, 'POST', '/reports', {'student_id': s.id}),
+        ('reports_class', professor, 'GET', '/reports/class', None),
+        ('reports_defaulters', professor, 'GET', '/reports/defaulters', None),
+        ('reports_defaulters_json', professor, 'GET', '/reports/defaulters?format=json', None),
+        ('attendance_register', professor, 'GET', f'/attendance/register?subject={subject}', None),
+        ('attendance_register_csv', professor, 'GET', f'/attendance/register?subject={subject}&format=csv', None,
+         {'expect': 200}),
+        ('attendance_register_pdf', professor, 'GET', f'/attendance/register?subject={subject}&format=pdf', None,
+         {'expect': 303}),
+        ('export_attendance_csv', professor, 'GET', f'/exports/attendance.csv?subject={subject}', None),
+        ('export_submissions_ndjson', professor, 'GET', f'/exports/submissions.ndjson?subject={a.subject_id}', None),
+        ('job_status', professor, 'GET', f'/jobs/{job_id}', None),
+        ('job_status_json', professor, 'GET', f'/jobs/{job_id}?format=json', None),
+        ('job_download', professor, 'GET', f'/jobs/{job_id}/download', None, {'expect': 200}),
+        ('metrics', None, 'GET', '/metrics', None),
+    ]
+
+
+# ----------------- MEASURING -----------------
+def percentile(values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def run_scenario(app, scenario, iterations, warmup):
+    import identity
+    import refdata
+
+    name, role, method, path, data, *options = scenario
+    options = options[0] if options else {}
+    client = app.test_client()
+    timings, statuses, sql = [], {}, []
+    errors = 0
+    identity.cache.clear()
+    refdata.cache.clear()
+    for i in range(warmup + iterations):
+        if role:
+            kind, ident = role
+            with client.session_transaction() as sess:
+                sess.clear()
+                sess[ROLE_KEYS[kind]] = ident
+        if 'setup' in options:
+            with app.app_context():
+                options['setup']()
+        body = data() if callable(data) else data
+        started = time.perf_counter()
+        response = client.open(path, method=method, data=body)
+        response.get_data()   # drain streamed bodies inside the timing
+        elapsed = time.perf_counter() - started
+        response.close()
+        errors += response.status_code >= 500 or response.status_code != options.get('expect', response.status_code)
+        if i < warmup:
+            continue
+        timings.append(elapsed)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        if 'X-Query-Count' in response.headers:
+            sql.append(int(response.headers['X-Query-Count']))
+
+    ordered = sorted(timings)
+    total = sum(timings)
+    ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None
+    return {
+        'method': method,
+        'path': path,
+        'requests': len(timings),
+        'statuses': statuses,
+        'errors': errors,
+        'throughput_rps': round(len(timings) / total, 2) if total else None,
+        'mean_ms': ms(total / len(timings)) if timings else None,
+        'p50_ms': ms(percentile(ordered, 50)),
+        'p95_ms': ms(percentile(ordered, 95)),
+        'p99_ms': ms(percentile(ordered, 99)),
+        'max_ms': ms(ordered[-1]) if ordered else None,
+        'sql_per_request': round(sum(sql) / len(sql), 1) if sql else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def dataset_counts():
+    from models import db, Student, AttendanceSession, AttendanceRecord, AssignmentSubmission, Announcement
+    return {model.__tablename__: db.session.query(model).count()
+            for model in (Student, AttendanceSession, AttendanceRecord, AssignmentSubmission, Announcement)}
+
+
+def run(args):
+    directory = use_dataset(args.data)
+    if not os.path.exists(os.path.join(directory, 'portal.db')):
+        sys.exit(f"No dataset in {directory}; run `python -m benchmark.generate` first.")
+
+    from app import create_app
+    # budgets on (over budget = 500); export jobs only queued, and never refused for a full queue;
+    # response archives start from an empty cache of their own; no deadline sweep thread writing mid-run
+    archive_dir = tempfile.mkdtemp(prefix='benchmark-archives-')
+    atexit.register(shutil.rmtree, archive_dir, ignore_errors=True)
+    app = create_app({'WTF_CSRF_ENABLED': False, 'QUERY_COUNT_HEADER': True, 'QUERY_BUDGET_ENFORCE': True,
+                      'JOB_WORKERS': 0, 'JOB_QUEUE_LIMIT': 0, 'ARCHIVE_CACHE_DIR': archive_dir,
+                      'SWEEP_INTERVAL_SECONDS': 0})
+
+    with app.app_context():
+        f = fixtures()
+        if f['group_announcement'] is None:
+            sys.exit(f"No group {f['student'].group} announcement with a file in {directory}; "
+                     "regenerate it with `python -m benchmark.generate`.")
+        f['job_id'] = finished_job(app, f"professor:{f['professor'].prof_id}", f['session'].subject_id)
+        selected = scenarios(f)
+        counts = dataset_counts()
+    if args.only:
+        wanted = set(args.only.split(','))
+        selected = [s for s in selected if s[0] in wanted]
+
+    results = {}
+    started = time.perf_counter()
+    for scenario in selected:
+        results[scenario[0]] = result = run_scenario(app, scenario, args.iterations, args.warmup)
+        print(f"{scenario[0]:<32} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+              f"p99 {result['p99_ms']:>9.2f} ms  {result['throughput_rps']:>8.1f} req/s  "
+              f"sql {result['sql_per_request'] if result['sql_per_request'] is not None else '-':>6}  "
+              f"{'ERRORS ' + str(result['errors']) if result['errors'] else ''}")
+
+    with app.app_context():
+        drop_queued_jobs()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'dataset': counts,
+            'wall_seconds': round(time.perf_counter() - started, 2),
+        },
+        'routes': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results written to {args.out}")
+    if args.compare:
+        compare(args.compare, report)
+    return report
+
+
+def compare(baseline_path, report):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline['meta'].get('commit') or baseline_path}:")
+    for name, result in report['routes'].items():
+        before = baseline['routes'].get(name)
+        if not before or not before.get('p50_ms'):
+            continue
+        deltas = []
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            change = (result[key] - before[key]) / before[key] * 100
+            deltas.append(f"{key[:3]} {before[key]:.2f} -> {result[key]:.2f} ({change:+.0f}%)")
+        print(f"  {name:<32} " + '  '.join(deltas))
+
+
+if __name__ == '__main__':
+    run(parse_args())
@@ -0,0 +1,218 @@
+import csv
+import io
+import json
+import os
+import shutil
+from datetime import date
+
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+from werkzeug.utils import secure_filename
+
+import archive_cache
+from jobs import handler
+from models import db, Student, Subject, AttendanceSession, AttendanceRecord, Assignment, AssignmentSubmission
+
+
+# ----------------- ATTENDANCE PDF -----------------
+def find_report_sessions(professor_id, subject_id, date_obj, subject_type):
+    # could be multiple if different group flags; everything the report prints is loaded up front
+    return AttendanceSession.query.filter_by(
+        professor_id=professor_id,
+        subject_id=subject_id,
+        date=date_obj,
+        subject_type=subject_type
+    ).options(
+        joinedload(AttendanceSession.subject),
+        joinedload(AttendanceSession.professor),
+        selectinload(AttendanceSession.records).joinedload(AttendanceRecord.student),
+    ).order_by(AttendanceSession.group_flag).all()
+
+
+def write_attendance_pdf(sessions, out, progress=None):
+    """Draw the attendance report for `sessions` into `out` (path or binary file)."""
+    from reportlab.pdfgen import canvas   # only job workers pay for reportlab
+    from reportlab.lib.pagesizes import letter
+
+    p = canvas.Canvas(out, pagesize=letter)
+    y = 750
+    for i, s in enumerate(sessions):
+        p.setFont("Helvetica-Bold", 11)
+        p.drawString(50, y, f"{s.subject.name} ({s.subject_type}) — Prof: {s.professor.name} — Date: {s.date} — Group: {s.group_flag}")
+        y -= 18
+        p.setFont("Helvetica", 10)
+        for r in s.records:
+            st = r.student
+            status = "Present" if r.present else "Absent"
+            line = f"{st.roll}  {st.name}  —  {status}"
+            p.drawString(60, y, line)
+            y -= 14
+            if y < 60:
+                p.showPage()
+                y = 750
+        y -= 10
+        if progress:
+            progress(i + 1, len(sessions))
+
+    p.save()
+
+
+@handler('attendance_pdf', ext='pdf')
+def attendance_pdf_job(params, out_path, progress):
+    sessions = find_report_sessions(
+        params['professor_id'], params['subject_id'], date.fromisoformat(params['date']), params['subject_type']
+    )
+    write_attendance_pdf(sessions, out_path, progress)
+    return 'attendance_report.pdf'
+
+
+@handler('register_pdf', ext='pdf')
+def register_pdf_job(params, out_path, progress):
+    from register import build_register, to_pdf
+
+    subject = db.session.get(Subject, params['subject_id'])
+    register = build_register(
+        subject.id,
+        date_from=date.fromisoformat(params['date_from']) if params.get('date_from') else None,
+        date_to=date.fromisoformat(params['date_to']) if params.get('date_to') else None,
+        group=params.get('group'),
+    )
+    progress(1, 2)
+    with open(out_path, 'wb') as f:
+        f.write(to_pdf(register, f"Attendance register — {subject.name}"))
+    return f"register_{secure_filename(subject.name)}.pdf"
+
+
+# ----------------- ASSIGNMENT RESPONSES ZIP -----------------
+@handler('assignment_zip', ext='zip')
+def assignment_zip_job(params, out_path, progress):
+    assignment_id = params['assignment_id']
+    submissions = AssignmentSubmission.query.filter_by(assignment_id=assignment_id).all()
+    filename, _ = archive_cache.get_archive(assignment_id, submissions)
+    cached = os.path.join(current_app.config['ARCHIVE_CACHE_DIR'], filename)
+    # the cache may evict or replace its copy later; the job keeps its own (a hard link when possible)
+    try:
+        os.link(cached, out_path)
+    except OSError:
+        shutil.copyfile(cached, out_path)
+    return filename
+
+
+# ----------------- RAW DATA STREAMS -----------------
+# Row-level exports for spreadsheets / analysis. Rows come off the cursor in
+# YIELD_PER chunks and are serialised as they arrive, so a full semester goes
+# out in constant memory and the first bytes leave before the query finishes.
+YIELD_PER = 1000
+FLUSH_BYTES = 64 * 1024
+FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def attendance_query(date_from=None, date_to=None, subject_id=None, professor_id=None, group=None):
+    stmt = (
+        select(
+            AttendanceRecord.id.label('record_id'),
+            AttendanceSession.date,
+            Subject.name.label('subject'),
+            AttendanceSession.subject_type,
+            AttendanceSession.group_flag,
+            AttendanceSession.professor_id,
+            Student.roll,
+            Student.name.label('student_name'),
+            Student.group.label('student_group'),
+            AttendanceRecord.present,
+            AttendanceRecord.note,
+        )
+        .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+        .join(Subject, Subject.id == AttendanceSession.subject_id)
+        .join(Student, Student.id == AttendanceRecord.student_id)
+        # primary key order streams straight off the table (no sort before the first row)
+        .order_by(AttendanceRecord.id)
+    )
+    if date_from:
+        stmt = stmt.where(AttendanceSession.date >= date_from)
+    if date_to:
+        stmt = stmt.where(AttendanceSession.date <= date_to)
+    if subject_id:
+        stmt = stmt.where(AttendanceSession.subject_id == subject_id)
+    if professor_id:
+        stmt = stmt.where(AttendanceSession.professor_id == professor_id)
+    if group:
+        stmt = stmt.where(Student.group == group)
+    return stmt
+
+
+def submissions_query(date_from=None, date_to=None, subject_id=None, professor_id=None, group=None):
+    stmt = (
+        select(
+            AssignmentSubmission.id.label('submission_id'),
+            Assignment.id.label('assignment_id'),
+            Assignment.title,
+            Assignment.subject_id,
+            Assignment.professor_id,
+            Assignment.assignment_type,
+            Assignment.due_date,
+            Student.roll,
+            Student.name.label('student_name'),
+            Student.group.label('student_group'),
+            AssignmentSubmission.status,
+            AssignmentSubmission.submitted_at,
+            AssignmentSubmission.submission_file.isnot(None).label('has_file'),
+        )
+        .join(Assignment, Assignment.id == AssignmentSubmission.assignment_id)
+        .join(Student, Student.id == AssignmentSubmission.student_id)
+        .order_by(AssignmentSubmission.id)
+    )
+    if date_from:
+        stmt = stmt.where(Assignment.due_date >= date_from)
+    if date_to:
+        stmt = stmt.where(Assignment.due_date <= date_to)
+    if subject_id:
+        stmt = stmt.where(Assignment.subject_id == subject_id)
+    if professor_id:
+        stmt = stmt.where(Assignment.professor_id == professor_id)
+    if group:
+        stmt = stmt.where(Student.group == group)
+    return stmt
+
+
+DATASETS = {
+    'attendance': attendance_query,
+    'submissions': submissions_query,
+}
+
+
+def _cell(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def iter_export(dataset, fmt, **filters):
+    """Yield `dataset` as CSV or NDJSON text, roughly FLUSH_BYTES at a time."""
+    stmt = DATASETS[dataset](**filters)
+    result = db.session.execute(stmt.execution_options(yield_per=YIELD_PER))
+    columns = list(result.keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n') if fmt == 'csv' else None
+    if writer:
+        writer.writerow(columns)
+
+    try:
+        for partition in result.partitions():
+            for row in partition:
+                values = [_cell(v) for v in row]
+                if writer:
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+                    buffer.write('\n')
+            if buffer.tell() >= FLUSH_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    finally:
+        result.close()
+    yield buffer.getvalue()
@@ -0,0 +1,70 @@
+import hashlib
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import func, tuple_
+
+from models import db
+
+# Keyset ("seek") pagination and conditional GET for the announcement feeds.
+# Pages are ordered newest first on (created_at, id); a cursor is the key of
+# the last row of the previous page, so each page is one indexed range scan
+# no matter how deep the reader goes.
+
+
+def encode_cursor(created_at, row_id):
+    return f"{created_at.isoformat()}_{row_id}"
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id) from a cursor string, or None if it's missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        stamp, row_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(stamp), int(row_id)
+    except ValueError:
+        return None
+
+
+def feed_state(model, *filters):
+    """(newest created_at, row count) of a feed, from one aggregate query."""
+    return db.session.query(func.max(model.created_at), func.count(model.id)).filter(*filters).one()
+
+
+def feed_etag(model, state, cursor, per_page):
+    newest, count = state
+    seed = f"{model.__tablename__}|{newest.isoformat() if newest else ''}|{count}|{cursor or ''}|{per_page}"
+    return hashlib.sha1(seed.encode()).hexdigest()
+
+
+def is_not_modified(etag, last_modified):
+    """True when the client's cached copy (If-None-Match / If-Modified-Since) is still current."""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        # HTTP dates have second precision
+        return request.if_modified_since.replace(tzinfo=None) >= last_modified.replace(microsecond=0)
+    return False
+
+
+def keyset_page(query, model, cursor, per_page):
+    """One page of `query` newest first, starting after `cursor`. Returns (items, next_cursor)."""
+    key = decode_cursor(cursor)
+    if key:
+        query = query.filter(tuple_(model.created_at, model.id) < key)
+    items = query.order_by(model.created_at.desc(), model.id.desc()).limit(per_page + 1).all()
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return items, next_cursor
+
+
+def set_cache_headers(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    # always revalidate; a matching ETag gets a 304 without a query or render
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,284 @@
+import os
+import random
+import sqlite3
+from datetime import date, datetime, timedelta
+
+from models import (db, Student, Professor, Admin, Subject, AttendanceSession, AttendanceRecord,
+                    AttendanceSummary, Assignment, AssignmentSubmission, Announcement, AnnouncementGroup)
+import identity
+import refdata
+
+# Fast database seeding for resets, tests and benchmarks:
+#   - rows go in through Core executemany with ids assigned up front (no ORM unit of work)
+#   - password hashes are precomputed, so no scrypt runs while seeding
+#   - a seeded database can be saved as a snapshot and restored with SQLite's
+#     backup API, which takes milliseconds instead of re-seeding
+
+# werkzeug scrypt hashes of the sample passwords (see readme.md) and of COHORT_PASSWORD
+PASSWORD_HASHES = {
+    'stud01login': 'scrypt:32768:8:1$Csg5oh6pztWjjYsi$df6bfae84fb6da93f00d8cbd1b0568810f73fc265f341b76b2e969040dde48b513f1752127eeba21cad9a8e95b020d38ba24316fc0fef617b36a7c8e16544d34',
+    'stud02login': 'scrypt:32768:8:1$DwpRmLVc3Lr7UdIQ$210e20b0aa03f43605456d8aafc034dc117b35bfb0ed71cf842348eb6ed934487727a27c02910b6ac6f9fdc9afa09b3575b22febbf95d21eefc3be1ee08fe175',
+    'stud03login': 'scrypt:32768:8:1$TnPs93vVSHRJfoEa$767b41fe167f5202970c51363e268dbe65154c23a949c3dd89ff5c23d084636415347ecf198ee071fa52213421b389a2032731dbf43e61647f5fe58f047d8312',
+    'stud04login': 'scrypt:32768:8:1$0GdgGgHzruMggLni$48d25d51b2759a0466a1e8965165fbfb5550fd537e59d86006ffb23e80b3ffa8734808ff7ac694649a4706828afe03863d76018029b320b3a3dfebe85e69e006',
+    'prof01login': 'scrypt:32768:8:1$cKM9nchTB5uYRxSr$522cd1c2adfa158aa5e88ec5cedf3550de4e4c8b01a7459361e9ec3e20a2f3b515bc097833ab31e9c1d6ece560421ad44c4cedf76aff01903ecd061d20ca1146',
+    'prof02login': 'scrypt:32768:8:1$qjN9htFFyrGnaF5e$62700f8e0784b11ef0f7c451c4d9f5a18e1fa3024b641b32823efaf6912ec393b2f6b551924ee419929e05075c241d0b83f4b986053027653929b56930e4336b',
+    'admin01login': 'scrypt:32768:8:1$cLGqjRdZxvoRaSiY$5f4aa7b707c6558e7cc9b528f55ea93ce8d688feff79f6344a890e6cf7c21ed49bf38986f960e6c1155a6a8c4f76ac92e72d5128b89f80c1df0fc20cd8460485',
+    'benchpass': 'scrypt:32768:8:1$GBYXpoWVmMUJIkPz$0da3c1065622fab7e059c490d6c5031369846d9d8d3ddc5bb0c1591d96f54cc34f4341dee95590ea7dece086a849d4d19e560b90619a7feb978d106016c4f96c',
+}
+COHORT_PASSWORD = 'benchpass'   # every generated cohort account logs in with this
+
+SAMPLE_STUDENTS = [
+    ("IT2501", "Riya Sharma", "A", False),
+    ("IT2502", "Aditya Sen", "A", True),
+    ("IT2503", "Soham Das", "B", False),
+    ("IT2504", "Priya Roy", "B", False),
+]
+SAMPLE_PROFESSORS = [
+    ("P101", "Dr. Arindam Banerjee"),
+    ("P102", "Dr. Debanjan Dey"),
+]
+SAMPLE_SUBJECTS = [
+    ("Data Structures", "Theory"),
+    ("Database Systems", "Theory"),
+    ("Operating Systems Lab", "Practical"),
+    ("Networks Lab", "Practical"),
+]
+
+FIRST_NAMES = ['Riya', 'Aditya', 'Soham', 'Priya', 'Arjun', 'Ananya', 'Rahul', 'Sneha', 'Kunal', 'Ishita',
+               'Rohan', 'Meera', 'Sayan', 'Tania', 'Arnab', 'Pooja', 'Debjit', 'Shreya', 'Nilanjan', 'Moumita']
+LAST_NAMES = ['Sharma', 'Sen', 'Das', 'Roy', 'Banerjee', 'Dey', 'Ghosh', 'Mukherjee', 'Chatterjee', 'Bose',
+              'Paul', 'Saha', 'Mondal', 'Dutta', 'Pal', 'Sarkar', 'Biswas', 'Nandi', 'Kar', 'Chakraborty']
+STORED_EXTS = ['.pdf', '.docx', '.zip']
+TEXT_EXTS = ['.txt', '.py', '.c']
+BATCH = 20000
+
+
+def insert_rows(table, rows):
+    for start in range(0, len(rows), BATCH):
+        db.session.execute(table.insert(), rows[start:start + BATCH])
+
+
+def password_hash(password):
+    from werkzeug.security import generate_password_hash
+    return PASSWORD_HASHES.get(password) or generate_password_hash(password)
+
+
+# ----------------- SAMPLE DATA -----------------
+def seed_sample():
+    """The small sample cohort from readme.md. Nothing is committed."""
+    insert_rows(Student.__table__, [
+        {'roll': roll, 'name': name, 'group': group, 'is_cr': is_cr,
+         'password_hash': password_hash(f"stud{str(i).zfill(2)}login")}
+        for i, (roll, name, group, is_cr) in enumerate(SAMPLE_STUDENTS, start=1)
+    ])
+    insert_rows(Professor.__table__, [
+        {'prof_id': pid, 'name': name, 'password_hash': password_hash(f"prof{str(i).zfill(2)}login")}
+        for i, (pid, name) in enumerate(SAMPLE_PROFESSORS, start=1)
+    ])
+    insert_rows(Admin.__table__, [{'username': 'admin01', 'password_hash': password_hash('admin01login')}])
+    insert_rows(Subject.__table__, [{'name': name, 'subject_type': stype} for name, stype in SAMPLE_SUBJECTS])
+    refdata.bump()
+    identity.bump()
+
+
+# ----------------- LARGE COHORT -----------------
+def add_cohort_arguments(parser):
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--professors', type=int, default=12)
+    parser.add_argument('--subjects', type=int, default=8)
+    parser.add_argument('--years', type=float, default=1.0, help='years of attendance history, ending yesterday')
+    parser.add_argument('--assignments-per-subject', type=int, default=6)
+    parser.add_argument('--file-assignments', type=int, default=4,
+                        help='how many assignments get real uploaded files (the rest are status only)')
+    parser.add_argument('--file-kb', type=int, default=24, help='average size of an uploaded file')
+    parser.add_argument('--announcements', type=int, default=400)
+    parser.add_argument('--seed', type=int, default=2529)
+
+
+def random_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def seed_cohort(args, uploads=None):
+    """Insert a synthetic cohort sized by `args` (see add_cohort_arguments). Nothing is committed.
+
+    Submission and announcement files are only written when `uploads` is given.
+    Returns row counts.
+    """
+    rng = random.Random(args.seed)
+    password = password_hash(COHORT_PASSWORD)
+    counts = {}
+
+    # people & subjects
+    insert_rows(Admin.__table__, [{'id': 1, 'username': 'admin01', 'password_hash': password}])
+    insert_rows(Professor.__table__, [
+        {'id': i, 'prof_id': f"P{100 + i}", 'name': f"Dr. {random_name(rng)}", 'password_hash': password}
+        for i in range(1, args.professors + 1)
+    ])
+    subjects = list(SAMPLE_SUBJECTS)
+    while len(subjects) < args.subjects:
+        n = len(subjects) + 1
+        subjects.append((f"Elective {n}" + (" Lab" if n % 2 else ""), "Practical" if n % 2 else "Theory"))
+    subjects = [(i, name, stype) for i, (name, stype) in enumerate(subjects[:args.subjects], start=1)]
+    insert_rows(Subject.__table__, [{'id': i, 'name': name, 'subject_type': stype} for i, name, stype in subjects])
+    refdata.bump()   # workers still running against the old data reload their dropdown lists
+    identity.bump()  # ... and forget the users they had cached
+
+    students = []
+    # the whole cohort is enrolled from the day before the first class
+    enrolled = datetime.combine(date.today() - timedelta(days=2 + int(args.years * 365)), datetime.min.time())
+    for i in range(1, args.students + 1):
+        group = 'A' if i <= (args.students + 1) // 2 else 'B'
+        students.append({
+            'id': i, 'roll': f"IT25{i:04d}", 'name': random_name(rng), 'password_hash': password,
+            'group': group, 'is_cr': i in (1, (args.students + 1) // 2 + 1), 'created_at': enrolled,
+        })
+    insert_rows(Student.__table__, students)
+    # how reliably each student turns up / hands work in
+    diligence = {s['id']: rng.uniform(0.55, 0.98) for s in students}
+    by_group = {'ALL': [s['id'] for s in students],
+                'A': [s['id'] for s in students if s['group'] == 'A'],
+                'B': [s['id'] for s in students if s['group'] == 'B']}
+
+    # attendance
+    # each subject meets on two fixed weekdays with one professor; labs run once per group
+    end = date.today() - timedelta(days=1)
+    day = end - timedelta(days=int(args.years * 365))
+    schedule = {sid: (rng.sample(range(5), 2), (sid - 1) % args.professors + 1, stype) for sid, _, stype in subjects}
+    sessions, records = [], []
+    session_id = record_id = 0
+    while day <= end:
+        if day.weekday() < 5 and rng.random() > 0.04:      # the odd holiday
+            for sid, (weekdays, prof_id, stype) in schedule.items():
+                if day.weekday() not in weekdays:
+                    continue
+                for group in (['A', 'B'] if stype == 'Practical' else ['ALL']):
+                    session_id += 1
+                    stamp_at = datetime.combine(day, datetime.min.time()) + timedelta(hours=rng.randint(9, 16))
+                    sessions.append({
+                        'id': session_id, 'date': day, 'subject_id': sid, 'subject_type': stype,
+                        'professor_id': prof_id, 'recorded_by_cr_id': by_group[group][0] if group != 'ALL' else 1,
+                        'group_flag': group, 'created_at': stamp_at, 'updated_at': stamp_at,
+                    })
+                    for student_id in by_group[group]:
+                        record_id += 1
+                        records.append({'id': record_id, 'session_id': session_id, 'student_id': student_id,
+                                        'present': rng.random() < diligence[student_id], 'note': None})
+                    if len(records) >= BATCH * 5:
+                        insert_rows(AttendanceSession.__table__, sessions)
+                        insert_rows(AttendanceRecord.__table__, records)
+                        sessions, records = [], []
+        day += timedelta(days=1)
+    insert_rows(AttendanceSession.__table__, sessions)
+    insert_rows(AttendanceRecord.__table__, records)
+    counts['attendance_sessions'] = session_id
+    counts['attendance_records'] = record_id
+    AttendanceSummary.rebuild()
+
+    # assignments
+    assignments, submissions = [], []
+    assignment_id = submission_id = 0
+    start_day = end - timedelta(days=int(args.years * 365))
+    span = max(1, (end - start_day).days + 30)
+    for sid, _, _ in subjects:
+        prof_id = schedule[sid][1]
+        for n in range(1, args.assignments_per_subject + 1):
+            assignment_id += 1
+            due = start_day + timedelta(days=rng.randrange(span))
+            online = rng.random() < 0.7
+            assignments.append({
+                'id': assignment_id, 'title': f"Assignment {n}", 'subject_id': sid, 'professor_id': prof_id,
+                'due_date': due, 'assignment_type': 'Online' if online else 'Offline', 'document': None,
+                'created_at': datetime.combine(due - timedelta(days=14), datetime.min.time()),
+            })
+            with_files = uploads and online and assignment_id <= args.file_assignments
+            for student in students:
+                roll, student_id = student['roll'], student['id']
+                if rng.random() < diligence[student_id]:
+                    status = 'Completed' if rng.random() < 0.4 else 'Submitted'
+                elif due < end:
+                    status = 'Missed'
+                else:
+                    status = 'Pending'
+                path = None
+                if with_files and status in ('Submitted', 'Completed'):
+                    path = write_submission(rng, uploads, roll, assignment_id, args.file_kb)
+                submission_id += 1
+                submissions.append({
+                    'id': submission_id, 'assignment_id': assignment_id, 'student_id': student_id,
+                    'status': status, 'submission_file': path,
+                    'submitted_at': datetime.combine(due, datetime.min.time()) if status in ('Submitted', 'Completed') else None,
+                })
+    insert_rows(Assignment.__table__, assignments)
+    insert_rows(AssignmentSubmission.__table__, submissions)
+    counts['assignments'] = assignment_id
+    counts['submissions'] = submission_id
+
+    # announcements
+    attachment = None
+    if uploads:
+        attachment = 'notice.pdf'
+        with open(os.path.join(uploads, attachment), 'wb') as f:
+            f.write(rng.randbytes(args.file_kb * 1024))
+    announcements, group_announcements = [], []
+    for i in range(1, args.announcements + 1):
+        created = datetime.combine(start_day, datetime.min.time()) + timedelta(minutes=rng.randrange(span * 24 * 60))
+        announcements.append({'id': i, 'title': f"Notice {i}", 'description': "Schedule update. " * rng.randint(1, 20),
+                              'filename': attachment if i % 10 == 0 else None, 'created_at': created})
+        group_announcements.append({'id': i, 'title': f"Group notice {i}", 'description': "Lab reminder. " * rng.randint(1, 10),
+                                    'filename': attachment if i % 5 == 0 else None,   # both groups get some
+                                    'group': 'A' if i % 2 else 'B', 'created_at': created})
+    insert_rows(Announcement.__table__, announcements)
+    insert_rows(AnnouncementGroup.__table__, group_announcements)
+
+    counts.update(students=args.students, professors=args.professors, subjects=args.subjects,
+                  announcements=args.announcements * 2)
+    return counts
+
+
+def write_submission(rng, uploads, roll, assignment_id, file_kb):
+    ext = rng.choice(STORED_EXTS + TEXT_EXTS)
+    path = os.path.join(uploads, f"{roll}_{assignment_id}_answer{ext}")
+    size = max(1, int(rng.uniform(0.25, 1.75) * file_kb * 1024))
+    with open(path, 'wb') as f:
+        if ext in TEXT_EXTS:
+            line = f"# {roll} assignment {assignment_id}\n".encode()
+            f.write((line * (size // len(line) + 1))[:size])
+        else:
+            f.write(rng.randbytes(size))
+    return path
+
+
+# ----------------- SNAPSHOTS -----------------
+def database_path():
+    path = db.engine.url.database
+    if db.engine.dialect.name != 'sqlite' or not path or path == ':memory:':
+        raise RuntimeError("Snapshots need a file-backed SQLite database")
+    return path
+
+
+def save_snapshot(path):
+    """Copy the app's database (committed state) to `path` with SQLite's online backup."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    source = sqlite3.connect(database_path())
+    target = sqlite3.connect(path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def restore_snapshot(path):
+    """Overwrite the app's database with a snapshot made by save_snapshot."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    db.session.remove()
+    db.engine.dispose()   # pooled connections would keep reading the old pages
+    source = sqlite3.connect(path)
+    target = sqlite3.connect(database_path())
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
@@ -0,0 +1,114 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+
+from flask import g, session
+from sqlalchemy import select
+
+from models import db, AppState, Student, Professor, Admin
+
+# Lightweight, read-only stand-ins for the logged-in user. They carry what the
+# views and templates read (ids, names, group/CR flag) without an ORM object.
+StudentIdentity = namedtuple('StudentIdentity', 'id roll name group is_cr')
+ProfessorIdentity = namedtuple('ProfessorIdentity', 'id prof_id name')
+AdminIdentity = namedtuple('AdminIdentity', 'id username')
+
+
+def _load_student(roll):
+    s = Student.query.filter_by(roll=roll).first()
+    return StudentIdentity(s.id, s.roll, s.name, s.group, bool(s.is_cr)) if s else None
+
+
+def _load_professor(prof_id):
+    p = Professor.query.filter_by(prof_id=prof_id).first()
+    return ProfessorIdentity(p.id, p.prof_id, p.name) if p else None
+
+
+def _load_admin(username):
+    a = Admin.query.filter_by(username=username).first()
+    return AdminIdentity(a.id, a.username) if a else None
+
+
+# kind -> (session key the login views set, loader)
+PRINCIPALS = {
+    'student': ('student_roll', _load_student),
+    'professor': ('prof_id', _load_professor),
+    'admin': ('admin_username', _load_admin),
+}
+
+
+# app_state key bumped (by bump()) whenever a user is changed or deleted, in any process
+VERSION_KEY = 'identity_version'
+
+
+class IdentityCache:
+    """Small thread-safe LRU of identities keyed by (kind, login key).
+
+    The whole cache belongs to one identity version: when another gunicorn
+    worker changes a user it bumps the version, and sync() empties this
+    process's cache on its next request, so a revoked CR flag or a deleted
+    account stops working everywhere at once. Entries also expire after `ttl`
+    seconds as a backstop for edits made straight in the database.
+    """
+
+    def __init__(self, maxsize=256, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def sync(self, version):
+        """Drop every entry if users changed (in any process) since they were cached."""
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+
+    def clear(self):
+        """Forget everything; the next request re-reads the version and reloads (what a fresh worker sees)."""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def get(self, kind, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry and entry[0] > now:
+                self._entries.move_to_end((kind, key))
+                return entry[1]
+        value = loader(key)
+        if value is not None:
+            with self._lock:
+                self._entries[(kind, key)] = (now + self.ttl, value)
+                self._entries.move_to_end((kind, key))
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+
+
+cache = IdentityCache()
+
+
+def bump():
+    """Invalidate cached identities in every worker. Call before committing the user change; nothing is committed."""
+    # a random stamp, like refdata's, so a reseeded database never repeats a version
+    AppState.put(VERSION_KEY, uuid.uuid4().hex)
+
+
+def init_app(app):
+    cache.maxsize = app.config.setdefault('IDENTITY_CACHE_SIZE', cache.maxsize)
+    cache.ttl = app.config.setdefault('IDENTITY_CACHE_TTL', cache.ttl)
+    app.before_request(load_identity)
+
+
+def load_identity():
+    """Resolve each logged-in principal once per request into g.student / g.professor / g.admin."""
+    if any(session.get(session_key) for session_key, _ in PRINCIPALS.values()):
+        cache.sync(db.session.scalar(select(AppState.value).where(AppState.key == VERSION_KEY)))
+    for kind, (session_key, loader) in PRINCIPALS.items():
+        key = session.get(session_key)
+        setattr(g, kind, cache.get(kind, key, loader) if key else None)
@@ -0,0 +1,247 @@
+import json
+import math
+import os
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select, update
+from werkzeug.exceptions import ServiceUnavailable
+
+from models import db, ExportJob
+import metrics
+
+# Local background jobs for slow exports. The queue is the export_job table in
+# the app's own SQLite database; every web process runs JOB_WORKERS daemon
+# threads that claim queued rows with a conditional UPDATE, so several gunicorn
+# workers can share one queue without a broker. `flask run-jobs` runs the same
+# loop as a standalone process.
+#
+# The queue is bounded on both ends, across all processes: at most
+# JOB_CONCURRENCY jobs render at once (the claim refuses to start another), and
+# once JOB_QUEUE_LIMIT jobs are waiting enqueue() raises QueueFull, which Flask
+# turns into a 503 with Retry-After. Wait and run times go to /metrics.
+
+HANDLERS = {}   # kind -> (function, file extension)
+
+_wakeup = threading.Event()
+_started_pid = None
+_start_lock = threading.Lock()
+
+
+def handler(kind, ext):
+    """Register `func(params, out_path, progress) -> download_name` for a job kind."""
+    def register(func):
+        HANDLERS[kind] = (func, ext)
+        return func
+    return register
+
+
+class QueueFull(ServiceUnavailable):
+    description = "Too many exports are queued right now. Please try again in a little while."
+
+
+def init_app(app):
+    app.config.setdefault('EXPORT_DIR', os.path.join(app.instance_path, 'exports'))
+    app.config.setdefault('JOB_WORKERS', int(os.environ.get('JOB_WORKERS', 1)))  # threads per process
+    app.config.setdefault('JOB_CONCURRENCY', int(os.environ.get('JOB_CONCURRENCY', 2)))  # running at once, all processes; 0 = no cap
+    app.config.setdefault('JOB_QUEUE_LIMIT', int(os.environ.get('JOB_QUEUE_LIMIT', 20)))  # waiting jobs; 0 = unbounded
+    app.config.setdefault('JOB_POLL_INTERVAL', 2)          # seconds between queue checks when idle
+    app.config.setdefault('JOB_HEARTBEAT_SECONDS', 60)     # how often a running job refreshes heartbeat_at
+    app.config.setdefault('JOB_STALE_SECONDS', 15 * 60)    # 'running' without a heartbeat for this long = worker died
+    app.config.setdefault('JOB_RETENTION_SECONDS', 24 * 60 * 60)
+    os.makedirs(app.config['EXPORT_DIR'], exist_ok=True)
+
+
+# ----------------- QUEUE -----------------
+def enqueue(kind, params, owner=None):
+    """Insert a queued job, commit it and make sure this process has workers to run it."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    limit = current_app.config['JOB_QUEUE_LIMIT']
+    if limit:
+        queued = _count('queued')
+        if queued >= limit:
+            raise QueueFull(retry_after=retry_after(queued))
+    job = ExportJob(id=uuid.uuid4().hex, kind=kind, params=json.dumps(params), owner=owner)
+    db.session.add(job)
+    db.session.commit()
+    start_workers(current_app._get_current_object())
+    _wakeup.set()
+    return job
+
+
+def _count(status):
+    return db.session.query(func.count(ExportJob.id)).filter(ExportJob.status == status).scalar()
+
+
+def retry_after(queued):
+    """Seconds until the queue has likely drained, from recent run times."""
+    recent = (db.session.query(ExportJob.started_at, ExportJob.finished_at)
+              .filter(ExportJob.status == 'done', ExportJob.started_at.isnot(None))
+              .order_by(ExportJob.finished_at.desc()).limit(20).all())
+    durations = sorted((finished - started).total_seconds() for started, finished in recent)
+    per_job = durations[len(durations) // 2] if durations else 10
+    slots = current_app.config['JOB_CONCURRENCY'] or current_app.config['JOB_WORKERS'] or 1
+    return min(300, max(5, math.ceil(per_job * math.ceil(queued / slots))))
+
+
+def _claim_next():
+    """Atomically move the oldest queued job to 'running'. Returns its id or None.
+
+    With JOB_CONCURRENCY set the same UPDATE also checks how many jobs are
+    running, so the cap holds across processes (SQLite runs it under its write lock).
+    """
+    limit = current_app.config['JOB_CONCURRENCY']
+    while True:
+        job_id = db.session.query(ExportJob.id).filter_by(status='queued').order_by(ExportJob.created_at).limit(1).scalar()
+        if job_id is None:
+            return None
+        claim = update(ExportJob).where(ExportJob.id == job_id, ExportJob.status == 'queued')
+        if limit:
+            running = select(func.count(ExportJob.id)).where(ExportJob.status == 'running').scalar_subquery()
+            claim = claim.where(running < limit)
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            claim.values(status='running', started_at=now, heartbeat_at=now, progress=0)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+        if limit and _count('running') >= limit:
+            return None   # all slots busy; try again after the poll interval
+        # another worker got it first; try the next one
+
+
+def _set(job_id, **values):
+    db.session.execute(update(ExportJob).where(ExportJob.id == job_id).values(**values))
+    db.session.commit()
+
+
+class Progress:
+    """Callable handed to job functions; writes the percentage only when it changes."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.last = 0
+
+    def __call__(self, done, total):
+        percent = min(99, int(done * 100 / total)) if total else 0
+        if percent != self.last:
+            self.last = percent
+            _set(self.job_id, progress=percent, heartbeat_at=datetime.utcnow())
+
+
+def _heartbeat(app, job_id, stop):
+    """Refresh heartbeat_at every JOB_HEARTBEAT_SECONDS until `stop` is set.
+
+    Runs beside the job, so a long step that never reports progress (building a
+    big PDF or zip) still shows its worker is alive and requeue_stale leaves it alone.
+    """
+    while not stop.wait(app.config['JOB_HEARTBEAT_SECONDS']):
+        with app.app_context():
+            try:
+                db.session.execute(update(ExportJob)
+                                   .where(ExportJob.id == job_id, ExportJob.status == 'running')
+                                   .values(heartbeat_at=datetime.utcnow()))
+                db.session.commit()
+            except Exception:
+                app.logger.exception("Heartbeat for job %s failed", job_id)
+            finally:
+                db.session.remove()
+
+
+def run_job(job_id):
+    job = db.session.get(ExportJob, job_id)
+    func, ext = HANDLERS[job.kind]
+    result_file = f"{job.id}.{ext}"
+    out_path = os.path.join(current_app.config['EXPORT_DIR'], result_file)
+    kind, waited = job.kind, (job.started_at - job.created_at).total_seconds()
+    started = time.perf_counter()
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(current_app._get_current_object(), job_id, stop),
+                     name=f"export-heartbeat-{job_id}", daemon=True).start()
+    try:
+        download_name = func(json.loads(job.params), out_path, Progress(job.id))
+    except Exception as e:
+        stop.set()
+        db.session.rollback()
+        current_app.logger.error("Job %s (%s) failed:\n%s", job_id, kind, traceback.format_exc())
+        _set(job_id, status='failed', message=str(e)[:200], finished_at=datetime.utcnow())
+        if os.path.exists(out_path):
+            os.remove(out_path)
+        metrics.record_job(kind, 'failed', waited, time.perf_counter() - started)
+        return
+    stop.set()
+    _set(job_id, status='done', progress=100, result_file=result_file,
+         download_name=download_name, finished_at=datetime.utcnow())
+    ran = time.perf_counter() - started
+    metrics.record_job(kind, 'done', waited, ran)
+    current_app.logger.info("Job %s (%s) done in %.2fs after %.2fs queued", job_id, kind, ran, waited)
+
+
+def requeue_stale():
+    """Put back jobs whose worker died mid-run (no heartbeat for JOB_STALE_SECONDS)."""
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['JOB_STALE_SECONDS'])
+    db.session.execute(
+        update(ExportJob)
+        .where(ExportJob.status == 'running', ExportJob.heartbeat_at < cutoff)
+        .values(status='queued', started_at=None, heartbeat_at=None, progress=0)
+    )
+    db.session.commit()
+
+
+def purge_old():
+    """Delete finished jobs past JOB_RETENTION_SECONDS together with their files."""
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['JOB_RETENTION_SECONDS'])
+    old = ExportJob.query.filter(ExportJob.status.in_(['done', 'failed']), ExportJob.finished_at < cutoff).all()
+    for job in old:
+        if job.result_file:
+            path = os.path.join(current_app.config['EXPORT_DIR'], job.result_file)
+            if os.path.exists(path):
+                os.remove(path)
+        db.session.delete(job)
+    db.session.commit()
+
+
+# ----------------- WORKERS -----------------
+def work(app, stop=None, once=False):
+    """Worker loop: claim and run jobs until `stop` is set (or the queue is empty, with once=True)."""
+    last_housekeeping = 0
+    while not (stop and stop.is_set()):
+        with app.app_context():
+            try:
+                if time.monotonic() - last_housekeeping > 60:
+                    requeue_stale()
+                    purge_old()
+                    last_housekeeping = time.monotonic()
+                job_id = _claim_next()
+                if job_id:
+                    run_job(job_id)
+            except Exception:
+                app.logger.exception("Job worker error")
+                job_id = None
+            finally:
+                db.session.remove()
+        if job_id:
+            continue
+        if once:
+            return
+        _wakeup.wait(app.config['JOB_POLL_INTERVAL'])
+        _wakeup.clear()
+
+
+def start_workers(app):
+    """Start this process's worker threads once (again after a fork)."""
+    global _started_pid
+    if _started_pid == os.getpid():
+        return
+    with _start_lock:
+        if _started_pid == os.getpid():
+            return
+        for i in range(app.config['JOB_WORKERS']):
+            threading.Thread(target=work, args=(app,), name=f"export-worker-{i}", daemon=True).start()
+        _started_pid = os.getpid()
@@ -0,0 +1,292 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: merging dead workers' files isn't serialised
+    fcntl = None
+
+from flask import Response, abort, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# Per-route request metrics in Prometheus text format.
+#
+# Every process keeps its counters in memory and writes them to
+# METRICS_DIR/<pid>.json at most every METRICS_FLUSH_SECONDS (and right before
+# answering /metrics). /metrics sums all the files, so whichever gunicorn worker
+# gets the scrape reports the whole server. Files left by workers that have
+# exited are folded into retired.json, keeping the counters monotonic across
+# worker restarts.
+#
+# SQL statement counts come from query_budget (g.query_count); DB time is
+# measured here around each cursor execute. Export jobs report their queue wait
+# and run time through record_job(), for sizing JOB_CONCURRENCY.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+COUNTERS = ('requests', 'sql', 'db_seconds', 'jobs')
+HISTOGRAMS = ('latency', 'job_wait', 'job_run')
+RETIRED = 'retired.json'
+
+_lock = threading.Lock()
+_state = {'pid': None, 'data': None, 'flushed_at': 0.0}
+
+
+def _empty():
+    return {section: {} for section in COUNTERS + HISTOGRAMS}
+
+
+def _data():
+    # counters start from zero again in a forked worker
+    if _state['pid'] != os.getpid():
+        _state.update(pid=os.getpid(), data=_empty(), flushed_at=0.0)
+    return _state['data']
+
+
+def init_app(app, db):
+    app.config.setdefault('METRICS_DIR', os.path.join(app.instance_path, 'metrics'))
+    app.config.setdefault('METRICS_FLUSH_SECONDS', float(os.environ.get('METRICS_FLUSH_SECONDS', 1)))
+    app.config.setdefault('METRICS_TOKEN', os.environ.get('METRICS_TOKEN'))  # optional bearer token for /metrics
+    os.makedirs(app.config['METRICS_DIR'], exist_ok=True)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_execute)
+    app.before_request(_start_timer)
+    app.after_request(_record)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    atexit.register(_flush_at_exit, app)
+
+
+# ----------------- RECORDING -----------------
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['metrics_started'] = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('metrics_started', None)
+    if started is not None and has_request_context():
+        g.db_seconds = g.get('db_seconds', 0.0) + time.perf_counter() - started
+
+
+def _start_timer():
+    g.metrics_started_at = time.perf_counter()
+
+
+def _record(response):
+    started = g.get('metrics_started_at')
+    if started is None or request.endpoint == 'metrics':
+        return response
+    elapsed = time.perf_counter() - started
+    route = f"{request.endpoint or 'unmatched'}\t{request.method}"
+
+    with _lock:
+        data = _data()
+        key = f"{route}\t{response.status_code}"
+        data['requests'][key] = data['requests'].get(key, 0) + 1
+        _observe(data['latency'], route, elapsed, LATENCY_BUCKETS)
+        data['sql'][route] = data['sql'].get(route, 0) + g.get('query_count', 0)
+        data['db_seconds'][route] = data['db_seconds'].get(route, 0.0) + g.get('db_seconds', 0.0)
+
+        if time.monotonic() - _state['flushed_at'] >= current_app.config['METRICS_FLUSH_SECONDS']:
+            _flush()
+    return response
+
+
+def record_job(kind, status, waited, ran):
+    """Count a finished export job and its queue wait / run time (seconds)."""
+    with _lock:
+        data = _data()
+        key = f"{kind}\t{status}"
+        data['jobs'][key] = data['jobs'].get(key, 0) + 1
+        _observe(data['job_wait'], kind, waited, JOB_BUCKETS)
+        _observe(data['job_run'], kind, ran, JOB_BUCKETS)
+        _flush()   # jobs are rare and may be the last thing this worker does
+
+
+def _observe(hists, key, value, buckets):
+    # [per-bucket counts..., sum, count]; buckets are cumulated when rendered
+    hist = hists.setdefault(key, [0] * len(buckets) + [0.0, 0])
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            hist[i] += 1
+            break
+    hist[-2] += value
+    hist[-1] += 1
+
+
+# ----------------- FILE STORE -----------------
+def _write_json(path, payload):
+    directory = os.path.dirname(path)
+    with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as tmp:
+        json.dump(payload, tmp)
+    os.replace(tmp.name, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _flush():
+    """Write this process's counters to its own file. Caller holds _lock."""
+    _write_json(os.path.join(current_app.config['METRICS_DIR'], f"{os.getpid()}.json"), _data())
+    _state['flushed_at'] = time.monotonic()
+
+
+def _flush_at_exit(app):
+    # the last few requests of an exiting worker haven't been written yet
+    if _state['pid'] == os.getpid():
+        with app.app_context(), _lock:
+            _flush()
+
+
+def _merge(into, other):
+    for section in COUNTERS:
+        counters = into.setdefault(section, {})
+        for key, value in other.get(section, {}).items():
+            counters[key] = counters.get(key, 0) + value
+    for section in HISTOGRAMS:
+        hists = into.setdefault(section, {})
+        for key, hist in other.get(section, {}).items():
+            current = hists.get(key)
+            hists[key] = [a + b for a, b in zip(current, hist)] if current else list(hist)
+    return into
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@contextmanager
+def _locked(directory):
+    with open(os.path.join(directory, '.lock'), 'a') as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def collect():
+    """Sum the counters of every worker, live or retired."""
+    directory = current_app.config['METRICS_DIR']
+    with _lock:
+        _flush()
+
+    total = _empty()
+    with _locked(directory):
+        retired = _read_json(os.path.join(directory, RETIRED)) or _empty()
+        retired_changed = False
+        for name in os.listdir(directory):
+            stem, ext = os.path.splitext(name)
+            if ext != '.json' or not stem.isdigit():
+                continue
+            path = os.path.join(directory, name)
+            snapshot = _read_json(path)
+            if snapshot is None:
+                continue
+            if _alive(int(stem)):
+                _merge(total, snapshot)
+            else:
+                _merge(retired, snapshot)
+                os.remove(path)
+                retired_changed = True
+        if retired_changed:
+            _write_json(os.path.join(directory, RETIRED), retired)
+    return _merge(total, retired)
+
+
+# ----------------- EXPOSITION -----------------
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def render(data):
+    lines = [
+        '# HELP portal_http_requests_total Requests handled, by endpoint, method and status code.',
+        '# TYPE portal_http_requests_total counter',
+    ]
+    for key, value in sorted(data['requests'].items()):
+        endpoint, method, status = key.split('\t')
+        lines.append(f"portal_http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {value}")
+
+    lines += [
+        '# HELP portal_http_request_duration_seconds Time spent handling requests.',
+        '# TYPE portal_http_request_duration_seconds histogram',
+    ]
+    for key, hist in sorted(data['latency'].items()):
+        endpoint, method = key.split('\t')
+        lines += _histogram('portal_http_request_duration_seconds', hist, LATENCY_BUCKETS,
+                            endpoint=endpoint, method=method)
+
+    lines += [
+        '# HELP portal_sql_statements_total SQL statements executed while handling requests.',
+        '# TYPE portal_sql_statements_total counter',
+    ]
+    for key, value in sorted(data['sql'].items()):
+        endpoint, method = key.split('\t')
+        lines.append(f"portal_sql_statements_total{_labels(endpoint=endpoint, method=method)} {value}")
+
+    lines += [
+        '# HELP portal_db_seconds_total Time spent in SQL statements while handling requests.',
+        '# TYPE portal_db_seconds_total counter',
+    ]
+    for key, value in sorted(data['db_seconds'].items()):
+        endpoint, method = key.split('\t')
+        lines.append(f"portal_db_seconds_total{_labels(endpoint=endpoint, method=method)} {value:.6f}")
+
+    lines += [
+        '# HELP portal_export_jobs_total Export jobs finished, by kind and outcome.',
+        '# TYPE portal_export_jobs_total counter',
+    ]
+    for key, value in sorted(data['jobs'].items()):
+        kind, status = key.split('\t')
+        lines.append(f"portal_export_jobs_total{_labels(kind=kind, status=status)} {value}")
+    for section, name, help_text in (
+        ('job_wait', 'portal_export_job_wait_seconds', 'Time export jobs spent queued before a worker took them.'),
+        ('job_run', 'portal_export_job_run_seconds', 'Time spent rendering export jobs.'),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for kind, hist in sorted(data[section].items()):
+            lines += _histogram(name, hist, JOB_BUCKETS, kind=kind)
+    return '\n'.join(lines) + '\n'
+
+
+def _histogram(name, hist, buckets, **labels):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(buckets, hist):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {hist[-1]}")
+    lines.append(f"{name}_sum{_labels(**labels)} {hist[-2]:.6f}")
+    lines.append(f"{name}_count{_labels(**labels)} {hist[-1]}")
+    return lines
+
+
+def metrics_view():
+    token = current_app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        abort(403)
+    return Response(render(collect()), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,27 @@
+"""student created_at
+
+Revision ID: 0f7d2b9e4a61
+Revises: e3f58a0c6b12
+Create Date: 2026-10-18 21:48:05.913262
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0f7d2b9e4a61'
+down_revision = 'e3f58a0c6b12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # existing students stay NULL: enrolled before this was tracked, so the deadline sweep treats them as always there
+    with op.batch_alter_table('student', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('student', schema=None) as batch_op:
+        batch_op.drop_column('created_at')
@@ -0,0 +1,29 @@
+"""app state
+
+Revision ID: 5d0c2b7e91a3
+Revises: 482abb67d940
+Create Date: 2026-10-18 18:40:12.207315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d0c2b7e91a3'
+down_revision = '482abb67d940'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('app_state',
+    sa.Column('key', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('app_state')
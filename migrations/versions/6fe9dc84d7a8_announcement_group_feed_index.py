@@ -0,0 +1,26 @@
+"""announcement group feed index
+
+Revision ID: 6fe9dc84d7a8
+Revises: ae624cc487f3
+Create Date: 2026-10-18 15:02:47.402113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6fe9dc84d7a8'
+down_revision = 'ae624cc487f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('announcement_group', schema=None) as batch_op:
+        batch_op.create_index('ix_announcement_group_group_created_at', ['group', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('announcement_group', schema=None) as batch_op:
+        batch_op.drop_index('ix_announcement_group_group_created_at')
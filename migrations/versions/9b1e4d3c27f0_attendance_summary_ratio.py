@@ -0,0 +1,29 @@
+"""attendance summary ratio
+
+Revision ID: 9b1e4d3c27f0
+Revises: 5d0c2b7e91a3
+Create Date: 2026-10-18 19:05:41.302118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1e4d3c27f0'
+down_revision = '5d0c2b7e91a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # a virtual generated column: SQLite can add it in place and computes it for existing rows
+    with op.batch_alter_table('attendance_summary', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('ratio', sa.Float(), sa.Computed('CAST(attended AS REAL) / total', ), nullable=True))
+        batch_op.create_index('ix_attendance_summary_subject_ratio', ['subject_id', 'ratio'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('attendance_summary', schema=None) as batch_op:
+        batch_op.drop_index('ix_attendance_summary_subject_ratio')
+        batch_op.drop_column('ratio')
@@ -0,0 +1,74 @@
+"""hot lookup indexes and uniqueness
+
+Revision ID: ae624cc487f3
+Revises: c7cff53c99ea
+Create Date: 2026-10-18 14:20:12.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ae624cc487f3'
+down_revision = 'c7cff53c99ea'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Drop duplicates the unique indexes would reject, keeping the row `.first()` used to return.
+    # Sessions first: move the records of a repeated subject/professor/date/group slot onto
+    # its lowest-id session, so the record cleanup below also dedupes the merged records.
+    op.execute(
+        "UPDATE attendance_record SET session_id = ("
+        "  SELECT MIN(k.id) FROM attendance_session k JOIN attendance_session s"
+        "    ON k.subject_id = s.subject_id AND k.professor_id = s.professor_id"
+        "   AND k.date = s.date AND k.group_flag = s.group_flag"
+        "  WHERE s.id = attendance_record.session_id"
+        ") WHERE session_id NOT IN "
+        "(SELECT MIN(id) FROM attendance_session GROUP BY subject_id, professor_id, date, group_flag)"
+    )
+    op.execute(
+        "DELETE FROM attendance_session WHERE id NOT IN "
+        "(SELECT MIN(id) FROM attendance_session GROUP BY subject_id, professor_id, date, group_flag)"
+    )
+    op.execute(
+        "DELETE FROM attendance_record WHERE id NOT IN "
+        "(SELECT MIN(id) FROM attendance_record GROUP BY session_id, student_id)"
+    )
+    op.execute(
+        "DELETE FROM assignment_submission WHERE id NOT IN "
+        "(SELECT MIN(id) FROM assignment_submission GROUP BY assignment_id, student_id)"
+    )
+
+    with op.batch_alter_table('assignment_submission', schema=None) as batch_op:
+        batch_op.create_index('uq_assignment_submission_assignment_student', ['assignment_id', 'student_id'], unique=True)
+
+    with op.batch_alter_table('attendance_record', schema=None) as batch_op:
+        batch_op.create_index('ix_attendance_record_student_id', ['student_id'], unique=False)
+        batch_op.create_index('uq_attendance_record_session_student', ['session_id', 'student_id'], unique=True)
+
+    with op.batch_alter_table('attendance_session', schema=None) as batch_op:
+        batch_op.create_index('uq_attendance_session_slot', ['subject_id', 'professor_id', 'date', 'group_flag'], unique=True)
+
+    # the record cleanup above may have changed the counts
+    op.execute("DELETE FROM attendance_summary")
+    op.execute(
+        "INSERT INTO attendance_summary (student_id, subject_id, attended, total) "
+        "SELECT r.student_id, s.subject_id, SUM(CASE WHEN r.present THEN 1 ELSE 0 END), COUNT(r.id) "
+        "FROM attendance_record r JOIN attendance_session s ON s.id = r.session_id "
+        "GROUP BY r.student_id, s.subject_id"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('attendance_session', schema=None) as batch_op:
+        batch_op.drop_index('uq_attendance_session_slot')
+
+    with op.batch_alter_table('attendance_record', schema=None) as batch_op:
+        batch_op.drop_index('uq_attendance_record_session_student')
+        batch_op.drop_index('ix_attendance_record_student_id')
+
+    with op.batch_alter_table('assignment_submission', schema=None) as batch_op:
+        batch_op.drop_index('uq_assignment_submission_assignment_student')
@@ -0,0 +1,39 @@
+"""attendance summary
+
+Revision ID: c7cff53c99ea
+Revises: aac7146f8673
+Create Date: 2026-10-18 14:11:40.591239
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7cff53c99ea'
+down_revision = 'aac7146f8673'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('attendance_summary',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('attended', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ),
+    sa.ForeignKeyConstraint(['subject_id'], ['subject.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'subject_id')
+    )
+    # fill the rollup from the records already in the database
+    op.execute(
+        "INSERT INTO attendance_summary (student_id, subject_id, attended, total) "
+        "SELECT r.student_id, s.subject_id, SUM(CASE WHEN r.present THEN 1 ELSE 0 END), COUNT(r.id) "
+        "FROM attendance_record r JOIN attendance_session s ON s.id = r.session_id "
+        "GROUP BY r.student_id, s.subject_id"
+    )
+
+
+def downgrade():
+    op.drop_table('attendance_summary')
@@ -0,0 +1,29 @@
+"""export job heartbeat
+
+Revision ID: e3f58a0c6b12
+Revises: 9b1e4d3c27f0
+Create Date: 2026-10-18 21:12:37.540916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3f58a0c6b12'
+down_revision = '9b1e4d3c27f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('export_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+    # jobs already running count as alive since they started
+    op.execute("UPDATE export_job SET heartbeat_at = started_at WHERE status = 'running'")
+
+
+def downgrade():
+    with op.batch_alter_table('export_job', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
@@ -1,4 +1,7 @@
+import json
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, date
 
@@ -12,8 +15,10 @@ class Student(db.Model):
     password_hash = db.Column(db.String(128))
     group = db.Column(db.String(10))
     is_cr = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)  # NULL = enrolled before this was tracked
 
     attendance_records = db.relationship('AttendanceRecord', back_populates='student', cascade='all, delete-orphan')
+    attendance_summaries = db.relationship('AttendanceSummary', back_populates='student', cascade='all, delete-orphan')
     submissions = db.relationship('AssignmentSubmission', back_populates='student', cascade='all, delete-orphan')
 
     def set_password(self, password):
@@ -61,6 +66,7 @@ class Subject(db.Model):
     subject_type = db.Column(db.String(20))  # "Theory" or "Practical"
 
     attendance_sessions = db.relationship('AttendanceSession', back_populates='subject', cascade='all, delete-orphan')
+    attendance_summaries = db.relationship('AttendanceSummary', back_populates='subject', cascade='all, delete-orphan')
     assignments = db.relationship('Assignment', back_populates='subject', cascade='all, delete-orphan')
 
     def __repr__(self):
@@ -68,6 +74,11 @@ class Subject(db.Model):
 
 # ----------------- ATTENDANCE MODELS -----------------
 class AttendanceSession(db.Model):
+    __table_args__ = (
+        # one session per subject/professor/date/group; also serves attendance_mark's lookup
+        db.Index('uq_attendance_session_slot', 'subject_id', 'professor_id', 'date', 'group_flag', unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     date = db.Column(db.Date, nullable=False, default=date.today)
     subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=False)
@@ -81,7 +92,25 @@ class AttendanceSession(db.Model):
     subject = db.relationship('Subject', back_populates='attendance_sessions')
     professor = db.relationship('Professor', back_populates='attendance_sessions')
     recorded_by_cr = db.relationship('Student', foreign_keys=[recorded_by_cr_id])
-    records = db.relationship('AttendanceRecord', back_populates='session', cascade='all, delete-orphan', lazy='dynamic')
+    # a plain list (not lazy='dynamic') so views can selectinload it together with the students
+    records = db.relationship('AttendanceRecord', back_populates='session', cascade='all, delete-orphan',
+                              order_by='AttendanceRecord.id')
+
+    @classmethod
+    def for_slot(cls, subject_id, professor_id, date, group_flag, **values):
+        """The session for a subject/professor/date/group slot, inserted with `values` if it doesn't exist.
+
+        The INSERT ... ON CONFLICT DO NOTHING also takes SQLite's write lock, so a
+        concurrent submission for the same slot waits for this transaction and then
+        finds the session (and its records) instead of failing on the unique index.
+        Nothing is committed.
+        """
+        slot = {'subject_id': subject_id, 'professor_id': professor_id, 'date': date, 'group_flag': group_flag}
+        db.session.execute(
+            sqlite_insert(cls.__table__).values(**slot, **values)
+            .on_conflict_do_nothing(index_elements=list(slot))
+        )
+        return cls.query.filter_by(**slot).one()
 
     def mark_student(self, student, present: bool, note: str = None):
         rec = AttendanceRecord.query.filter_by(session_id=self.id, student_id=student.id).first()
@@ -94,9 +123,38 @@ class AttendanceSession(db.Model):
                 rec.note = note
         return rec
 
+    def mark_students(self, students, present_ids):
+        """Batched mark_student: make this session's records match the posted roster.
+
+        Existing rows are diffed against `present_ids`; only rows whose status
+        changed are updated, missing students are inserted and records for
+        students no longer on the roster are removed. Nothing is committed.
+        Returns {student_id: (attended_delta, total_delta)} for AttendanceSummary.
+        """
+        existing = {rec.student_id: rec for rec in self.records} if self.id else {}
+        deltas = {}
+
+        for student in students:
+            present = student.id in present_ids
+            rec = existing.pop(student.id, None)
+            if rec is None:
+                db.session.add(AttendanceRecord(session=self, student_id=student.id, present=present))
+                deltas[student.id] = (int(present), 1)
+            elif rec.present != present:
+                rec.present = present
+                deltas[student.id] = (1 if present else -1, 0)
+
+        for student_id, rec in existing.items():
+            db.session.delete(rec)
+            deltas[student_id] = (-int(rec.present), -1)
+
+        if deltas and self.id:
+            self.updated_at = datetime.utcnow()
+        return deltas
+
     def get_report(self):
         rows = []
-        for rec in self.records.order_by(AttendanceRecord.id).all():
+        for rec in self.records:
             rows.append({
                 "student_id": rec.student.id,
                 "roll": rec.student.roll,
@@ -111,6 +169,11 @@ class AttendanceSession(db.Model):
         return f"<AttendanceSession {self.id} {self.subject.name} {self.date}>"
 
 class AttendanceRecord(db.Model):
+    __table_args__ = (
+        db.Index('uq_attendance_record_session_student', 'session_id', 'student_id', unique=True),
+        db.Index('ix_attendance_record_student_id', 'student_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('attendance_session.id'), nullable=False)
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
@@ -120,6 +183,101 @@ class AttendanceRecord(db.Model):
     session = db.relationship('AttendanceSession', back_populates='records')
     student = db.relationship('Student', back_populates='attendance_records')
 
+class AttendanceSummary(db.Model):
+    # Rollup of AttendanceRecord per (student, subject), kept in step by the
+    # routes that write attendance so dashboards don't have to count raw rows.
+    __table_args__ = (
+        # "who is below X% in subject Y" is a range scan (see reporting.defaulters)
+        db.Index('ix_attendance_summary_subject_ratio', 'subject_id', 'ratio'),
+    )
+
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), primary_key=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), primary_key=True)
+    attended = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    # attended / total (NULL while total is 0); generated by SQLite, so every
+    # upsert above and rebuild() below keep it current without touching it
+    ratio = db.Column(db.Float, db.Computed('CAST(attended AS REAL) / total'))
+
+    student = db.relationship('Student', back_populates='attendance_summaries')
+    subject = db.relationship('Subject', back_populates='attendance_summaries')
+
+    @classmethod
+    def apply_deltas(cls, subject_id, deltas):
+        """Add {student_id: (attended_delta, total_delta)} to the rollup rows of one subject.
+
+        Runs as a single upsert on the current session, so it commits together
+        with the attendance records that caused it.
+        """
+        rows = [
+            {"student_id": student_id, "subject_id": subject_id, "attended": attended, "total": total}
+            for student_id, (attended, total) in deltas.items()
+            if attended or total
+        ]
+        if not rows:
+            return
+        stmt = sqlite_insert(cls.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.student_id, cls.subject_id],
+            set_={
+                "attended": cls.__table__.c.attended + stmt.excluded.attended,
+                "total": cls.__table__.c.total + stmt.excluded.total,
+            },
+        )
+        db.session.execute(stmt, rows)
+
+    @classmethod
+    def remove_sessions(cls, *criteria):
+        """Subtract the records of the sessions matching `criteria` from the rollup.
+
+        Call before deleting those sessions: one grouped query over their records,
+        then apply_deltas per subject. Nothing is committed.
+        """
+        counts = (
+            db.session.query(
+                AttendanceSession.subject_id,
+                AttendanceRecord.student_id,
+                func.sum(case((AttendanceRecord.present == True, 1), else_=0)),
+                func.count(AttendanceRecord.id),
+            )
+            .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+            .filter(*criteria)
+            .group_by(AttendanceSession.subject_id, AttendanceRecord.student_id)
+        )
+        by_subject = {}
+        for subject_id, student_id, attended, total in counts:
+            by_subject.setdefault(subject_id, {})[student_id] = (-attended, -total)
+        for subject_id, deltas in by_subject.items():
+            cls.apply_deltas(subject_id, deltas)
+
+    @classmethod
+    def totals_for_student(cls, student_id):
+        """Return (attended, total) across all subjects for one student."""
+        attended, total = db.session.query(
+            func.coalesce(func.sum(cls.attended), 0),
+            func.coalesce(func.sum(cls.total), 0),
+        ).filter(cls.student_id == student_id).one()
+        return attended, total
+
+    @classmethod
+    def rebuild(cls):
+        """Recreate every rollup row from the raw attendance records."""
+        db.session.query(cls).delete()
+        source = (
+            db.session.query(
+                AttendanceRecord.student_id,
+                AttendanceSession.subject_id,
+                func.sum(case((AttendanceRecord.present == True, 1), else_=0)),
+                func.count(AttendanceRecord.id),
+            )
+            .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+            .group_by(AttendanceRecord.student_id, AttendanceSession.subject_id)
+        )
+        db.session.execute(
+            cls.__table__.insert().from_select(['student_id', 'subject_id', 'attended', 'total'], source.statement)
+        )
+        return db.session.query(cls).count()
+
 # ----------------- ASSIGNMENT MODELS -----------------
 class Assignment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -139,6 +297,10 @@ class Assignment(db.Model):
         return f"<Assignment {self.title} ({self.assignment_type})>"
 
 class AssignmentSubmission(db.Model):
+    __table_args__ = (
+        db.Index('uq_assignment_submission_assignment_student', 'assignment_id', 'student_id', unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     assignment_id = db.Column(db.Integer, db.ForeignKey('assignment.id'), nullable=False)
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
@@ -149,6 +311,69 @@ class AssignmentSubmission(db.Model):
     assignment = db.relationship('Assignment', back_populates='submissions')
     student = db.relationship('Student', back_populates='submissions')
 
+    @classmethod
+    def statuses_for(cls, assignment_id):
+        """{student_id: status} for every submission row of one assignment, in one query."""
+        return dict(
+            db.session.query(cls.student_id, cls.status).filter(cls.assignment_id == assignment_id)
+        )
+
+    @classmethod
+    def bulk_set_statuses(cls, assignment_id, statuses):
+        """Apply {student_id: status} to one assignment with a single INSERT ... ON CONFLICT DO UPDATE.
+
+        Rows that don't exist yet are created; existing rows only have their
+        status changed (uploaded files are left alone). Nothing is committed.
+        """
+        rows = [
+            {"assignment_id": assignment_id, "student_id": student_id, "status": status}
+            for student_id, status in statuses.items()
+            if status
+        ]
+        if not rows:
+            return
+        stmt = sqlite_insert(cls.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.assignment_id, cls.student_id],
+            set_={"status": stmt.excluded.status},
+        )
+        db.session.execute(stmt, rows)
+
+    @classmethod
+    def sweep_overdue(cls, today=None):
+        """Set-based update_status() for every assignment whose due date has passed.
+
+        Open rows (not Submitted/Completed/Missed) are flipped to 'Missed' with one
+        UPDATE, and students with no row at all get a 'Missed' row with one
+        INSERT ... SELECT, but only if they were enrolled by the due date (students
+        added later were never set that work). Nothing is committed.
+        Returns (updated, inserted).
+        """
+        today = today or date.today()
+        overdue = db.select(Assignment.id).where(Assignment.due_date < today)
+        updated = db.session.execute(
+            db.update(cls)
+            .where(cls.assignment_id.in_(overdue),
+                   cls.status.notin_(['Submitted', 'Completed', 'Missed']))
+            .values(status='Missed')
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        missing = (
+            db.select(Assignment.id, Student.id, db.literal('Missed'))
+            .select_from(Assignment)
+            .join(Student, db.true())   # every student x every overdue assignment
+            .where(Assignment.due_date < today)
+            .where(db.or_(Student.created_at.is_(None), func.date(Student.created_at) <= Assignment.due_date))
+            .where(~db.exists().where(cls.assignment_id == Assignment.id, cls.student_id == Student.id))
+        )
+        inserted = db.session.execute(
+            sqlite_insert(cls.__table__)
+            .from_select(['assignment_id', 'student_id', 'status'], missing)
+            .on_conflict_do_nothing()
+        ).rowcount
+        return updated, inserted
+
     def update_status(self):
         today = date.today()
         if self.status in ['Submitted', 'Completed']:
@@ -171,6 +396,11 @@ class Announcement(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class AnnouncementGroup(db.Model):
+    __table_args__ = (
+        # serves the per-group feed, newest first
+        db.Index('ix_announcement_group_group_created_at', 'group', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -180,3 +410,55 @@ class AnnouncementGroup(db.Model):
 
     def __repr__(self):
         return f"<AnnouncementGroup {self.title} ({self.group})>"
+
+# ----------------- BACKGROUND JOBS -----------------
+class ExportJob(db.Model):
+    # Queue row for exports run by the in-process job workers (see jobs.py)
+    __table_args__ = (
+        db.Index('ix_export_job_status_created_at', 'status', 'created_at'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.Text, nullable=False, default='{}')  # JSON
+    owner = db.Column(db.String(80), nullable=True)  # "professor:P101", "admin:admin01", ...
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'running', 'done', 'failed'
+    progress = db.Column(db.Integer, nullable=False, default=0)  # percent
+    message = db.Column(db.String(200), nullable=True)
+    result_file = db.Column(db.String(200), nullable=True)  # inside EXPORT_DIR
+    download_name = db.Column(db.String(200), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # refreshed while running; stale = worker died
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ExportJob {self.id} {self.kind} {self.status} {self.progress}%>"
+
+# ----------------- APP STATE -----------------
+class AppState(db.Model):
+    # small shared key/value store for bookkeeping that every worker needs to see
+    # (e.g. when the deadline sweep last ran)
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Text, nullable=True)  # JSON
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def put(cls, key, value):
+        """Upsert one key (value is stored as JSON). Nothing is committed."""
+        now = datetime.utcnow()
+        stmt = sqlite_insert(cls.__table__).values(key=key, value=json.dumps(value), updated_at=now)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[cls.key], set_={'value': stmt.excluded.value, 'updated_at': now}
+        ))
+
+    @classmethod
+    def fetch(cls, key):
+        """(value, updated_at) for a key, or (None, None)."""
+        row = db.session.get(cls, key)
+        if row is None:
+            return None, None
+        return (json.loads(row.value) if row.value else None), row.updated_at
+
+    def __repr__(self):
+        return f"<AppState {self.key}>"
@@ -0,0 +1,61 @@
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# Counts the SQL statements each request sends through the app's engine.
+#   - g.query_count holds the running total for the current request
+#   - QUERY_COUNT_HEADER adds it to responses as X-Query-Count
+#   - views decorated with @query_budget(n) are checked after the request: over budget
+#     logs a warning, or raises QueryBudgetExceeded when QUERY_BUDGET_ENFORCE is on,
+#     so an N+1 regression fails loudly in tests.
+# Both settings default to None, meaning "on when app.debug / app.testing"; they are
+# read per request because TESTING is usually switched on after the app is imported.
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(limit):
+    """Declare the most statements a view may issue per request."""
+    def decorate(view):
+        view.query_budget = limit
+        return view
+    return decorate
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def _start_count():
+    g.query_count = 0
+
+
+def _setting(name, default):
+    value = current_app.config[name]
+    return default if value is None else value
+
+
+def _check_budget(response):
+    count = g.get('query_count', 0)
+    if _setting('QUERY_COUNT_HEADER', current_app.debug or current_app.testing):
+        response.headers['X-Query-Count'] = str(count)
+
+    view = current_app.view_functions.get(request.endpoint)
+    limit = getattr(view, 'query_budget', None)
+    if limit is not None and count > limit:
+        message = f"{request.method} {request.path} ({request.endpoint}) ran {count} SQL statements, budget is {limit}"
+        if _setting('QUERY_BUDGET_ENFORCE', current_app.testing):
+            raise QueryBudgetExceeded(message)
+        current_app.logger.warning(message)
+    return response
+
+
+def init_app(app, db):
+    app.config.setdefault('QUERY_COUNT_HEADER', None)
+    app.config.setdefault('QUERY_BUDGET_ENFORCE', None)
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _count_statement)
+    app.before_request(_start_count)
+    app.after_request(_check_budget)
@@ -0,0 +1,74 @@
+import threading
+import uuid
+from collections import namedtuple
+
+from flask import g
+from sqlalchemy import select
+
+from models import db, AppState, Professor, Subject
+
+# Professors and subjects fill the dropdowns of most CR/professor pages but only
+# change a few times a semester. Each worker keeps one copy of both lists,
+# stamped with the version stored in app_state; a request costs a single
+# primary-key lookup unless an admin changed something since (in any worker),
+# in which case the lists are reloaded once.
+ProfessorRef = namedtuple('ProfessorRef', 'id prof_id name')
+SubjectRef = namedtuple('SubjectRef', 'id name subject_type')
+
+VERSION_KEY = 'refdata_version'
+# statements a request pays when its worker has to reload (version + both lists);
+# views with a @query_budget that read these lists add it to their own count
+REFRESH_QUERIES = 3
+
+
+class ReferenceCache:
+    """Thread-safe, process-local copy of the professor/subject lists (sorted by name)."""
+
+    def __init__(self):
+        self._version = None
+        self._data = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        # checked once per request; later calls in the same request reuse the answer
+        if 'refdata' in g:
+            return g.refdata
+        # read the version before the lists: if an edit lands in between we store
+        # newer lists under the older version and simply reload on the next request
+        version = db.session.scalar(select(AppState.value).where(AppState.key == VERSION_KEY))
+        with self._lock:
+            data = self._data if self._data is not None and self._version == version else None
+        if data is None:
+            data = {
+                'professors': tuple(ProfessorRef(p.id, p.prof_id, p.name)
+                                    for p in Professor.query.order_by(Professor.name)),
+                'subjects': tuple(SubjectRef(s.id, s.name, s.subject_type)
+                                  for s in Subject.query.order_by(Subject.name)),
+            }
+            with self._lock:
+                self._version, self._data = version, data
+        g.refdata = data
+        return data
+
+    def clear(self):
+        """Forget this worker's copy; the next request reloads it (what a fresh worker sees)."""
+        with self._lock:
+            self._version = self._data = None
+
+
+cache = ReferenceCache()
+
+
+def professors():
+    return cache.current()['professors']
+
+
+def subjects():
+    return cache.current()['subjects']
+
+
+def bump():
+    """Mark the lists as changed for every worker. Call before committing the change itself; nothing is committed."""
+    # an opaque stamp rather than a counter, so a reseeded database never reuses a version a worker already holds
+    AppState.put(VERSION_KEY, uuid.uuid4().hex)
+    g.pop('refdata', None)
@@ -0,0 +1,156 @@
+import csv
+import io
+
+import numpy as np
+from sqlalchemy import select
+
+from models import db, Student, AttendanceSession, AttendanceRecord
+
+# Classic attendance register: one row per student, one column per session.
+# All records for the subject/date range come back in one query and are
+# pivoted into an int8 matrix (1 present, 0 absent, -1 not on that session's
+# roll, e.g. the other group's lab), so every total and percentage below is a
+# vectorised reduction over rows or columns.
+
+PRESENT, ABSENT, NOT_ON_ROLL = 1, 0, -1
+
+
+class Register:
+    def __init__(self, students, sessions, matrix):
+        self.students = students      # [(id, roll, name, group)] in roll order
+        self.sessions = sessions      # [(id, date, group_flag)] in date order
+        self.matrix = matrix          # int8, len(students) x len(sessions)
+
+        on_roll = matrix != NOT_ON_ROLL
+        present = matrix == PRESENT
+        self.student_attended = present.sum(axis=1)
+        self.student_total = on_roll.sum(axis=1)
+        self.session_present = present.sum(axis=0)
+        self.session_total = on_roll.sum(axis=0)
+        self.student_percent = _percent(self.student_attended, self.student_total)
+        self.session_percent = _percent(self.session_present, self.session_total)
+        attended, total = int(self.student_attended.sum()), int(self.student_total.sum())
+        self.overall_percent = round(attended * 100 / total, 1) if total else 0.0
+
+    def __bool__(self):
+        return bool(self.students)
+
+    def rows(self):
+        """(student, cells, attended, total, percent) per student, for templates."""
+        for i, student in enumerate(self.students):
+            yield (student, self.matrix[i].tolist(), int(self.student_attended[i]),
+                   int(self.student_total[i]), float(self.student_percent[i]))
+
+    def session_label(self, i):
+        _, day, group_flag = self.sessions[i]
+        return f"{day:%d %b}" + (f" ({group_flag})" if group_flag != 'ALL' else '')
+
+
+def _percent(part, whole):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.round(np.where(whole > 0, part * 100.0 / np.maximum(whole, 1), 0.0), 1)
+
+
+def build_register(subject_id, date_from=None, date_to=None, subject_type=None, group=None):
+    stmt = (
+        select(
+            AttendanceRecord.student_id, Student.roll, Student.name, Student.group,
+            AttendanceRecord.session_id, AttendanceSession.date, AttendanceSession.group_flag,
+            AttendanceRecord.present,
+        )
+        .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+        .join(Student, Student.id == AttendanceRecord.student_id)
+        .where(AttendanceSession.subject_id == subject_id)
+    )
+    if date_from:
+        stmt = stmt.where(AttendanceSession.date >= date_from)
+    if date_to:
+        stmt = stmt.where(AttendanceSession.date <= date_to)
+    if subject_type:
+        stmt = stmt.where(AttendanceSession.subject_type == subject_type)
+    if group:
+        stmt = stmt.where(Student.group == group)
+    rows = db.session.execute(stmt).all()
+    if not rows:
+        return Register([], [], np.empty((0, 0), dtype=np.int8))
+
+    student_col, session_col, present_col = (np.fromiter((r[i] for r in rows), dtype=np.int64, count=len(rows))
+                                             for i in (0, 4, 7))
+    student_ids, row_of = np.unique(student_col, return_inverse=True)
+    session_ids, col_of = np.unique(session_col, return_inverse=True)
+
+    matrix = np.full((len(student_ids), len(session_ids)), NOT_ON_ROLL, dtype=np.int8)
+    matrix[row_of, col_of] = present_col
+
+    students = {r[0]: (r[0], r[1], r[2], r[3]) for r in rows}
+    sessions = {r[4]: (r[4], r[5], r[6]) for r in rows}
+    student_order = sorted(range(len(student_ids)), key=lambda i: students[int(student_ids[i])][1])
+    session_order = sorted(range(len(session_ids)), key=lambda j: sessions[int(session_ids[j])][1:])
+
+    return Register(
+        [students[int(student_ids[i])] for i in student_order],
+        [sessions[int(session_ids[j])] for j in session_order],
+        matrix[np.ix_(student_order, session_order)],
+    )
+
+
+# ----------------- OUTPUT -----------------
+CELL_TEXT = {PRESENT: 'P', ABSENT: 'A', NOT_ON_ROLL: ''}
+
+
+def to_csv(register):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['Roll', 'Name'] + [register.session_label(j) for j in range(len(register.sessions))]
+                    + ['Attended', 'Total', '%'])
+    for student, cells, attended, total, percent in register.rows():
+        writer.writerow([student[1], student[2]] + [CELL_TEXT[c] for c in cells] + [attended, total, percent])
+    writer.writerow(['', 'Present %'] + register.session_percent.tolist() + ['', '', register.overall_percent])
+    return out.getvalue()
+
+
+def to_pdf(register, title, columns_per_page=18):
+    """Landscape register; wide semesters are split into blocks of `columns_per_page` sessions."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Table, TableStyle
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), leftMargin=24, rightMargin=24, topMargin=24, bottomMargin=24)
+    styles = getSampleStyleSheet()
+    story = []
+    n_sessions = len(register.sessions)
+    blocks = range(0, max(n_sessions, 1), columns_per_page)
+    for b, start in enumerate(blocks):
+        stop = min(start + columns_per_page, n_sessions)
+        last = b == len(blocks) - 1
+        header = ['Roll', 'Name'] + [register.session_label(j) for j in range(start, stop)]
+        if last:
+            header += ['Att.', 'Total', '%']
+        data = [header]
+        for student, cells, attended, total, percent in register.rows():
+            row = [student[1], student[2][:22]] + [CELL_TEXT[c] for c in cells[start:stop]]
+            if last:
+                row += [attended, total, percent]
+            data.append(row)
+        footer = ['', 'Present %'] + register.session_percent[start:stop].tolist()
+        if last:
+            footer += ['', '', register.overall_percent]
+        data.append(footer)
+
+        table = Table(data, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('FONT', (0, 0), (-1, -1), 'Helvetica', 7),
+            ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 7),
+            ('FONT', (0, -1), (-1, -1), 'Helvetica-Bold', 7),
+            ('ALIGN', (2, 0), (-1, -1), 'CENTER'),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.whitesmoke),
+        ]))
+        heading = title if len(blocks) == 1 else f"{title} — sessions {start + 1}–{stop} of {n_sessions}"
+        story += [Paragraph(heading, styles['Heading3']), table]
+        if not last:
+            story.append(PageBreak())
+    doc.build(story)
+    return buffer.getvalue()
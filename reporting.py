@@ -0,0 +1,180 @@
+import math
+from fractions import Fraction
+
+from sqlalchemy import func, case, and_
+
+from models import db, Student, Subject, AttendanceSummary, Assignment, AssignmentSubmission
+
+# Statuses that count as "handed in" on the reports
+SUBMITTED_STATUSES = ('Submitted', 'Completed')
+
+# Minimum attendance (%) before a student counts as a defaulter
+DEFAULT_THRESHOLD = 75
+
+
+def _submitted_count():
+    return func.sum(case((AssignmentSubmission.status.in_(SUBMITTED_STATUSES), 1), else_=0))
+
+
+# ----------------- SINGLE STUDENT -----------------
+def student_report(student_id):
+    """Attendance and assignment standing of one student, overall and per subject.
+
+    One query per dimension: attendance comes from the rollup table, assignments
+    from a single GROUP BY over assignment outer-joined to the student's submissions.
+    """
+    per_subject_attendance = []
+    for row, subject_name in (
+        db.session.query(AttendanceSummary, Subject.name)
+        .join(Subject, Subject.id == AttendanceSummary.subject_id)
+        .filter(AttendanceSummary.student_id == student_id, AttendanceSummary.total > 0)
+        .order_by(Subject.name)
+    ):
+        per_subject_attendance.append({
+            'subject_id': row.subject_id,
+            'subject_name': subject_name,
+            'present': row.attended,
+            'total': row.total
+        })
+
+    per_subject_assignments = []
+    assignment_rows = (
+        db.session.query(
+            Subject.id,
+            Subject.name,
+            func.count(Assignment.id),
+            func.coalesce(_submitted_count(), 0),
+        )
+        .join(Assignment, Assignment.subject_id == Subject.id)
+        .outerjoin(AssignmentSubmission, and_(
+            AssignmentSubmission.assignment_id == Assignment.id,
+            AssignmentSubmission.student_id == student_id
+        ))
+        .group_by(Subject.id, Subject.name)
+        .order_by(Subject.name)
+    )
+    for subject_id, subject_name, total, submitted in assignment_rows:
+        per_subject_assignments.append({
+            'subject_id': subject_id,
+            'subject_name': subject_name,
+            'submitted': submitted,
+            'total': total
+        })
+
+    return {
+        'attendance_summary': {
+            'attended': sum(r['present'] for r in per_subject_attendance),
+            'total': sum(r['total'] for r in per_subject_attendance)
+        },
+        'assignment_summary': {
+            'submitted': sum(r['submitted'] for r in per_subject_assignments),
+            'total': sum(r['total'] for r in per_subject_assignments)
+        },
+        'per_subject_attendance': per_subject_attendance,
+        'per_subject_assignments': per_subject_assignments,
+    }
+
+
+# ----------------- WHOLE CLASS -----------------
+def class_report():
+    """Students x subjects matrix for the whole cohort.
+
+    Returns (subjects, rows) where each row is
+    {'student': Student, 'cells': {subject_id: {...}}, 'attended', 'total', 'submitted', 'assignments'}.
+    Every dimension is loaded with one aggregate query regardless of cohort size.
+    """
+    students = Student.query.order_by(Student.roll).all()
+    subjects = Subject.query.order_by(Subject.name).all()
+
+    attendance = {
+        (student_id, subject_id): (attended, total)
+        for student_id, subject_id, attended, total in db.session.query(
+            AttendanceSummary.student_id, AttendanceSummary.subject_id,
+            AttendanceSummary.attended, AttendanceSummary.total
+        )
+    }
+
+    assignments_per_subject = dict(
+        db.session.query(Assignment.subject_id, func.count(Assignment.id)).group_by(Assignment.subject_id)
+    )
+
+    submitted = {
+        (student_id, subject_id): count
+        for student_id, subject_id, count in db.session.query(
+            AssignmentSubmission.student_id, Assignment.subject_id, func.count(AssignmentSubmission.id)
+        )
+        .join(Assignment, Assignment.id == AssignmentSubmission.assignment_id)
+        .filter(AssignmentSubmission.status.in_(SUBMITTED_STATUSES))
+        .group_by(AssignmentSubmission.student_id, Assignment.subject_id)
+    }
+
+    rows = []
+    for student in students:
+        row = {'student': student, 'cells': {}, 'attended': 0, 'total': 0, 'submitted': 0, 'assignments': 0}
+        for subj in subjects:
+            attended, total = attendance.get((student.id, subj.id), (0, 0))
+            cell = {
+                'attended': attended,
+                'total': total,
+                'submitted': submitted.get((student.id, subj.id), 0),
+                'assignments': assignments_per_subject.get(subj.id, 0)
+            }
+            row['cells'][subj.id] = cell
+            row['attended'] += cell['attended']
+            row['total'] += cell['total']
+            row['submitted'] += cell['submitted']
+            row['assignments'] += cell['assignments']
+        rows.append(row)
+
+    return subjects, rows
+
+
+# ----------------- DEFAULTERS -----------------
+def classes_to_recover(attended, total, threshold=DEFAULT_THRESHOLD):
+    """Consecutive classes a student has to attend to get back to `threshold` %.
+
+    Smallest k >= 0 with (attended + k) / (total + k) >= threshold / 100, i.e.
+    k = ceil((threshold * total - 100 * attended) / (100 - threshold)).
+    None when it can't be reached (a 100% threshold after any absence).
+    """
+    threshold = Fraction(str(threshold))   # exact, so 66.6 doesn't round up a class
+    if 100 * attended >= threshold * total:
+        return 0
+    if threshold >= 100:
+        return None
+    return math.ceil((threshold * total - 100 * attended) / (100 - threshold))
+
+
+def defaulters(threshold=DEFAULT_THRESHOLD, subject_id=None, group=None):
+    """Students below `threshold` % attendance, per subject, lowest first.
+
+    Reads the rollup table, whose ratio column is kept current by every
+    attendance write and indexed with the subject, so a per-subject lookup is a
+    range scan instead of a count over the raw records.
+    """
+    query = (
+        db.session.query(AttendanceSummary.attended, AttendanceSummary.total, Student, Subject.id, Subject.name)
+        .join(Student, Student.id == AttendanceSummary.student_id)
+        .join(Subject, Subject.id == AttendanceSummary.subject_id)
+        .filter(AttendanceSummary.total > 0, AttendanceSummary.ratio < threshold / 100)
+    )
+    if subject_id:
+        query = query.filter(AttendanceSummary.subject_id == subject_id)
+    if group:
+        query = query.filter(Student.group == group)
+
+    rows = []
+    for attended, total, student, subject_id, subject_name in query.order_by(Subject.name, AttendanceSummary.ratio, Student.roll):
+        needed = classes_to_recover(attended, total, threshold)
+        if needed == 0:
+            continue   # float ratio landed just under an exact threshold
+        rows.append({
+            'student': student,
+            'subject_id': subject_id,
+            'subject_name': subject_name,
+            'attended': attended,
+            'total': total,
+            'percent': round(attended * 100 / total, 1),
+            'classes_needed': needed,
+        })
+    return rows
@@ -1,8 +1,32 @@
+import argparse
 import os
-from app import app, db
-from models import Student, Professor, Admin, Subject
+import time
+from flask_migrate import stamp
+from app import create_app
+from models import db, Student, Professor, Admin, Subject, AttendanceRecord, AssignmentSubmission
+import fixtures
 
 DB_FILE = "gcect_it_25_29.db"
+app = create_app()
+DEFAULT_SNAPSHOT = os.path.join(app.instance_path, 'fixture_snapshot.db')
+
+parser = argparse.ArgumentParser(description="Reset the portal database.")
+parser.add_argument('--fixture', action='store_true',
+                    help='seed a large synthetic cohort instead of the sample data (size with the options below)')
+parser.add_argument('--snapshot', nargs='?', const=DEFAULT_SNAPSHOT, metavar='PATH',
+                    help='after seeding, save the database as a snapshot (default: instance/fixture_snapshot.db)')
+parser.add_argument('--restore', nargs='?', const=DEFAULT_SNAPSHOT, metavar='PATH',
+                    help='skip seeding and restore a saved snapshot instead')
+fixtures.add_cohort_arguments(parser)
+args = parser.parse_args()
+started = time.perf_counter()
+
+# ----------------- Fast path: restore a snapshot -----------------
+if args.restore:
+    with app.app_context():
+        fixtures.restore_snapshot(args.restore)
+    print(f"✅ Restored {args.restore} in {(time.perf_counter() - started) * 1000:.0f} ms")
+    raise SystemExit
 
 # ----------------- Step 1: Delete old database -----------------
 if os.path.exists(DB_FILE):
@@ -19,67 +43,46 @@ with app.app_context():
 
     # Then recreate
     db.create_all()
+    # tables are already at the latest schema, record that for Flask-Migrate
+    stamp()
     print("✅ Tables created successfully!")
 
-    print("✅ Tables created successfully!")
-
-    # ----------------- Step 3: Add sample Students -----------------
-    students = [
-        ("IT2501", "Riya Sharma", "A", False),
-        ("IT2502", "Aditya Sen", "A", True),
-        ("IT2503", "Soham Das", "B", False),
-        ("IT2504", "Priya Roy", "B", False),
-    ]
-    for i, (roll, name, group, is_cr) in enumerate(students, start=1):
-        s = Student(roll=roll, name=name, group=group, is_cr=is_cr)
-        s.set_password(f"stud{str(i).zfill(2)}login")
-        db.session.add(s)
-
-    # ----------------- Step 4: Add sample Professors -----------------
-    professors = [
-        ("P101", "Dr. Arindam Banerjee"),
-        ("P102", "Dr. Debanjan Dey"),
-    ]
-    for i, (pid, name) in enumerate(professors, start=1):
-        p = Professor(prof_id=pid, name=name)
-        p.set_password(f"prof{str(i).zfill(2)}login")
-        db.session.add(p)
-
-    # ----------------- Step 5: Add Admin -----------------
-    admin = Admin(username="admin01")
-    admin.set_password("admin01login")
-    db.session.add(admin)
-
-    # ----------------- Step 6: Add Subjects -----------------
-    subjects = [
-        ("Data Structures", "Theory"),
-        ("Database Systems", "Theory"),
-        ("Operating Systems Lab", "Practical"),
-        ("Networks Lab", "Practical"),
-    ]
-    for name, stype in subjects:
-        db.session.add(Subject(name=name, subject_type=stype))
+    # ----------------- Step 3: Add data -----------------
+    # bulk inserts with precomputed password hashes (see fixtures.py)
+    if args.fixture:
+        # cohort accounts all use fixtures.COHORT_PASSWORD; no upload files are written
+        counts = fixtures.seed_cohort(args)
+    else:
+        fixtures.seed_sample()
 
     # Commit everything
     db.session.commit()
-    print("✅ Sample data inserted successfully!")
+    print(f"✅ Sample data inserted successfully! ({time.perf_counter() - started:.1f}s)")
+
+    if args.snapshot:
+        fixtures.save_snapshot(args.snapshot)
+        print(f"📦 Snapshot saved to {args.snapshot} (restore with: python reset_db.py --restore)")
 
-    # ----------------- Step 7: Verification -----------------
+    # ----------------- Step 4: Verification -----------------
     print("\n--- Database Verification ---")
-    print("Students:")
-    for s in Student.query.all():
-        print(f"  {s.roll} | {s.name} | Group {s.group} | CR: {s.is_cr}")
+    if args.fixture:
+        for model in (Student, Professor, Subject, AttendanceRecord, AssignmentSubmission):
+            print(f"  {model.__tablename__}: {db.session.query(model).count()}")
+    else:
+        print("Students:")
+        for s in Student.query.all():
+            print(f"  {s.roll} | {s.name} | Group {s.group} | CR: {s.is_cr}")
 
-    print("\nProfessors:")
-    for p in Professor.query.all():
-        print(f"  {p.prof_id} | {p.name}")
+        print("\nProfessors:")
+        for p in Professor.query.all():
+            print(f"  {p.prof_id} | {p.name}")
 
-    print("\nAdmin:")
-    for a in Admin.query.all():
-        print(f"  {a.username}")
+        print("\nAdmin:")
+        for a in Admin.query.all():
+            print(f"  {a.username}")
 
-    print("\nSubjects:")
-    for sub in Subject.query.all():
-        print(f"  {sub.name} ({sub.subject_type})")
+        print("\nSubjects:")
+        for sub in Subject.query.all():
+            print(f"  {sub.name} ({sub.subject_type})")
 
     print("\n✅ Database reset and verified successfully!")
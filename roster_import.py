@@ -0,0 +1,168 @@
+import csv
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import insert, update
+from werkzeug.security import generate_password_hash
+
+from models import db, Student
+
+# Columns a roster file must have; is_cr and password are optional
+REQUIRED_COLUMNS = ('roll', 'name', 'group')
+GROUPS = ('A', 'B')
+TRUTHY = ('1', 'y', 'yes', 'true', 'cr')
+
+# below this many passwords a process pool costs more than it saves
+PARALLEL_HASH_MIN = 8
+
+# key for the cells a row has beyond the header (csv.DictReader's restkey)
+OVERFLOW = '_overflow'
+
+
+class RosterError(ValueError):
+    """The roster file as a whole can't be read (bad format or missing columns)."""
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.rejected = []   # (line number, roll, reason)
+
+    def __repr__(self):
+        return f"<ImportResult created={len(self.created)} updated={len(self.updated)} rejected={len(self.rejected)}>"
+
+
+# ----------------- READING -----------------
+def _rows_from_csv(stream):
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''), restkey=OVERFLOW)
+    try:
+        # decoding happens as the rows are read
+        return reader.fieldnames or [], list(reader)
+    except UnicodeDecodeError:
+        raise RosterError("Roster CSV must be saved as UTF-8 (in Excel: Save As → \"CSV UTF-8\").")
+    except csv.Error as e:
+        raise RosterError(f"Roster CSV can't be read: {e}")
+
+
+def _rows_from_xlsx(stream):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RosterError("XLSX rosters need the openpyxl package; upload a CSV instead.")
+    try:
+        sheet = load_workbook(stream, read_only=True, data_only=True).active
+    except Exception:   # openpyxl raises zipfile/XML/its own errors for damaged files
+        raise RosterError("Roster XLSX can't be opened; save it again from Excel or upload a CSV.")
+    rows = sheet.iter_rows(values_only=True)
+    header = [str(c).strip() if c is not None else '' for c in next(rows, [])]
+    parsed = []
+    for row in rows:
+        cells = ['' if c is None else str(c) for c in row]
+        values = dict(zip(header, cells))
+        if len(cells) > len(header):
+            values[OVERFLOW] = cells[len(header):]
+        parsed.append(values)
+    return header, parsed
+
+
+def read_roster(stream, filename):
+    """Parse a CSV or XLSX roster into a list of dicts with normalised, lower-case keys."""
+    if filename.lower().endswith('.xlsx'):
+        header, rows = _rows_from_xlsx(stream)
+    elif filename.lower().endswith('.csv'):
+        header, rows = _rows_from_csv(stream)
+    else:
+        raise RosterError("Roster must be a .csv or .xlsx file.")
+
+    columns = {h.strip().lower() for h in header if h}
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise RosterError(f"Roster is missing column(s): {', '.join(missing)}")
+    return [_normalise(row) for row in rows]
+
+
+def _normalise(row):
+    values, extra = {}, list(row.pop(OVERFLOW, None) or ())
+    for key, value in row.items():
+        key = (key or '').strip().lower()
+        if key:
+            values[key] = (value or '').strip()
+        else:
+            extra.append(value)
+    # cells past the header (or under a blank heading): empty ones, like Excel's trailing
+    # separators, are ignored; anything else rejects the row
+    values[OVERFLOW] = any((cell or '').strip() for cell in extra)
+    return values
+
+
+# ----------------- HASHING -----------------
+def hash_passwords(passwords, workers=None):
+    """generate_password_hash over a process pool; scrypt is CPU-bound so threads wouldn't help."""
+    if len(passwords) < PARALLEL_HASH_MIN:
+        return [generate_password_hash(p) for p in passwords]
+    workers = workers or os.cpu_count() or 1
+    # spawn, not fork: we may be inside a threaded gunicorn worker holding DB connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(generate_password_hash, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+# ----------------- IMPORT -----------------
+def import_roster(rows, workers=None):
+    """Upsert students by roll, like manage_students does for a single form post.
+
+    Existing rolls get name/group/CR updated (and password only when one is given);
+    new rolls are inserted with one executemany. Nothing is committed.
+    """
+    result = ImportResult()
+    existing = dict(db.session.query(Student.roll, Student.id))
+
+    to_create, to_update, seen = [], [], set()
+    for line, row in enumerate(rows, start=2):   # line 1 is the header
+        roll, name, group = row.get('roll', ''), row.get('name', ''), row.get('group', '').upper()
+        password = row.get('password', '')
+        if row.get(OVERFLOW):
+            result.rejected.append((line, roll, "more cells than the header has columns"))
+            continue
+        if not roll or not name:
+            result.rejected.append((line, roll, "roll and name are required"))
+            continue
+        if len(roll) > 20 or len(name) > 50:
+            result.rejected.append((line, roll, "roll or name too long"))
+            continue
+        if group not in GROUPS:
+            result.rejected.append((line, roll, f"group must be one of {', '.join(GROUPS)}"))
+            continue
+        if roll in seen:
+            result.rejected.append((line, roll, "duplicate roll in file"))
+            continue
+        if roll not in existing and not password:
+            result.rejected.append((line, roll, "password is required for new students"))
+            continue
+        seen.add(roll)
+
+        values = {'roll': roll, 'name': name, 'group': group, 'is_cr': row.get('is_cr', '').lower() in TRUTHY}
+        if roll in existing:
+            values['id'] = existing[roll]
+            to_update.append((values, password))
+        else:
+            to_create.append((values, password))
+
+    pending = [(values, password) for values, password in to_create + to_update if password]
+    for (values, _), password_hash in zip(pending, hash_passwords([p for _, p in pending], workers)):
+        values['password_hash'] = password_hash
+
+    if to_create:
+        db.session.execute(insert(Student), [values for values, _ in to_create])
+    # bulk UPDATE by primary key, grouped so each executemany has the same columns
+    with_password = [values for values, password in to_update if password]
+    without_password = [values for values, password in to_update if not password]
+    for batch in (with_password, without_password):
+        if batch:
+            db.session.execute(update(Student), batch)
+
+    result.created = [values['roll'] for values, _ in to_create]
+    result.updated = [values['roll'] for values, _ in to_update]
+    return result
@@ -0,0 +1,118 @@
+import logging
+import os
+import re
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+# Opt-in slow statement log. With SLOW_QUERY_MS set, every statement slower than
+# that is written to instance/logs/slow_queries.log (rotated) with its
+# parameters, the route that ran it and SQLite's EXPLAIN QUERY PLAN. Full table
+# scans of the big tables (SLOW_QUERY_WATCH_TABLES) are flagged in the header
+# line so they are easy to grep for.
+
+logger = logging.getLogger('portal.slow_query')
+
+SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(.*)$')
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+
+
+def init_app(app, db):
+    threshold = os.environ.get('SLOW_QUERY_MS')
+    app.config.setdefault('SLOW_QUERY_MS', float(threshold) if threshold else None)  # None = off
+    app.config.setdefault('SLOW_QUERY_LOG', os.path.join(app.instance_path, 'logs', 'slow_queries.log'))
+    app.config.setdefault('SLOW_QUERY_LOG_MAX_BYTES', 5 * 1024 * 1024)
+    app.config.setdefault('SLOW_QUERY_LOG_BACKUPS', 5)
+    app.config.setdefault('SLOW_QUERY_WATCH_TABLES', ('attendance_record', 'assignment_submission'))
+    if app.config['SLOW_QUERY_MS'] is None:
+        return
+
+    path = app.config['SLOW_QUERY_LOG']
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not any(getattr(h, 'baseFilename', None) == os.path.abspath(path) for h in logger.handlers):
+        handler = RotatingFileHandler(path, maxBytes=app.config['SLOW_QUERY_LOG_MAX_BYTES'],
+                                      backupCount=app.config['SLOW_QUERY_LOG_BACKUPS'], encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s pid=%(process)d %(message)s'))
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    threshold = app.config['SLOW_QUERY_MS'] / 1000.0
+    watched = app.config['SLOW_QUERY_WATCH_TABLES']
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info['slow_query_started'] = time.perf_counter()
+
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('slow_query_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed >= threshold:
+            log_statement(cursor, statement, parameters, elapsed, executemany, watched)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before_execute)
+        event.listen(db.engine, 'after_cursor_execute', after_execute)
+
+
+def caller():
+    if has_request_context():
+        return f"{request.method} {request.path} ({request.endpoint})"
+    return f"thread {threading.current_thread().name}"
+
+
+def explain(cursor, statement, parameters):
+    """EXPLAIN QUERY PLAN rows as (depth, detail), or [] when the statement can't be explained."""
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return []
+    try:
+        # a separate cursor, so rows the original statement hasn't handed out yet are untouched
+        plan_cursor = cursor.connection.cursor()
+        try:
+            rows = plan_cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters or ()).fetchall()
+        finally:
+            plan_cursor.close()
+    except Exception as e:
+        return [(0, f"(no plan: {e})")]
+
+    depth = {0: -1}
+    plan = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        plan.append((depth[node_id], detail))
+    return plan
+
+
+def full_scans(plan, watched):
+    """Watched tables (or their SQLAlchemy aliases, e.g. attendance_record_1) read without an index."""
+    flagged = []
+    for _, detail in plan:
+        match = SCAN.match(detail)
+        if not match or 'USING' in match.group(2):
+            continue
+        name = match.group(1)
+        for table in watched:
+            if name == table or re.fullmatch(table + r'_\d+', name):
+                flagged.append(table)
+    return flagged
+
+
+def log_statement(cursor, statement, parameters, elapsed, executemany, watched):
+    plan = [] if executemany else explain(cursor, statement, parameters)
+    flags = ''.join(f" [FULL SCAN {table}]" for table in full_scans(plan, watched))
+    params = repr(parameters)
+    if len(params) > 500:
+        params = params[:500] + '...'
+    lines = [
+        f"{elapsed * 1000:.1f} ms  {caller()}{flags}",
+        '  ' + ' '.join(statement.split()),
+        f"  params: {params}",
+    ]
+    if plan:
+        lines.append('  plan:')
+        lines += [f"    {'  ' * level}{detail}" for level, detail in plan]
+    logger.warning('\n'.join(lines))
@@ -0,0 +1,100 @@
+import os
+from functools import partial
+
+from sqlalchemy import event
+
+# Connection profile applied to every new SQLite connection. Each key can be
+# overridden through app.config or an environment variable of the same name,
+# e.g. SQLITE_BUSY_TIMEOUT=10000 gunicorn 'app:create_app()'
+DEFAULT_PROFILE = {
+    'SQLITE_JOURNAL_MODE': 'WAL',      # readers don't block the writer and vice versa
+    'SQLITE_BUSY_TIMEOUT': 5000,       # ms to wait for a lock before "database is locked"
+    'SQLITE_SYNCHRONOUS': 'NORMAL',    # durable enough with WAL, no fsync on every commit
+    'SQLITE_CACHE_SIZE': -16000,       # negative means KiB, so ~16 MB page cache per connection
+    'SQLITE_MMAP_SIZE': 134217728,     # 128 MB of the file memory-mapped for reads
+    'SQLITE_POOL_SIZE': 5,             # connections kept open per gunicorn worker
+    'SQLITE_MAX_OVERFLOW': 5,
+    'SQLITE_POOL_TIMEOUT': 10,         # seconds to wait for a free pooled connection
+}
+
+# config key -> PRAGMA name, in the order they are applied
+PRAGMAS = (
+    ('SQLITE_BUSY_TIMEOUT', 'busy_timeout'),
+    ('SQLITE_JOURNAL_MODE', 'journal_mode'),
+    ('SQLITE_SYNCHRONOUS', 'synchronous'),
+    ('SQLITE_CACHE_SIZE', 'cache_size'),
+    ('SQLITE_MMAP_SIZE', 'mmap_size'),
+)
+
+# PRAGMA synchronous reads back as a number
+SYNCHRONOUS_LEVELS = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}
+
+
+def load_config(config):
+    """Fill in the profile keys missing from `config`, taking environment variables first."""
+    for key, default in DEFAULT_PROFILE.items():
+        if key in config:
+            continue
+        value = os.environ.get(key, default)
+        config[key] = type(default)(value) if isinstance(default, int) else str(value).upper()
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database."""
+    uri = config.get('SQLALCHEMY_DATABASE_URI', '')
+    if not uri.startswith('sqlite') or ':memory:' in uri or uri == 'sqlite://':
+        return {}
+    return {
+        'pool_size': config['SQLITE_POOL_SIZE'],
+        'max_overflow': config['SQLITE_MAX_OVERFLOW'],
+        'pool_timeout': config['SQLITE_POOL_TIMEOUT'],
+    }
+
+
+def _apply_pragmas(config, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for key, pragma in PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}={config[key]}")
+    cursor.close()
+
+
+def install(app, db):
+    """Apply the profile on every connect of the app's engine."""
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != 'sqlite':
+            return
+        event.listen(engine, 'connect', partial(_apply_pragmas, app.config))
+
+
+def effective_settings(app, db):
+    """Read back the settings SQLite actually uses on a fresh pooled connection."""
+    with app.app_context():
+        settings = {}
+        with db.engine.connect() as conn:
+            if conn.dialect.name != 'sqlite':
+                return settings
+            for key, pragma in PRAGMAS:
+                value = conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+                if pragma == 'synchronous':
+                    value = SYNCHRONOUS_LEVELS.get(value, value)
+                settings[pragma] = value.upper() if isinstance(value, str) else value
+        pool = db.engine.pool
+        settings['pool'] = pool.status() if hasattr(pool, 'status') else type(pool).__name__
+        return settings
+
+
+def self_check(app, db):
+    """Log the effective settings at startup and warn about any that didn't take."""
+    settings = effective_settings(app, db)
+    if not settings:
+        return settings
+    app.logger.info("SQLite profile in effect: %s", settings)
+    for key, pragma in PRAGMAS:
+        wanted = app.config[key]
+        if str(settings[pragma]).upper() != str(wanted).upper():
+            app.logger.warning("SQLite %s is %s, wanted %s", pragma, settings[pragma], wanted)
+    # don't carry the check's pooled connection into forked gunicorn workers
+    with app.app_context():
+        db.engine.dispose()
+    return settings
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+
+from models import db, AppState, AssignmentSubmission
+
+# Deadline sweep: marks everything past its due date as 'Missed' in two
+# set-based statements (see AssignmentSubmission.sweep_overdue) and records the
+# run in app_state, so views can rely on the stored status instead of calling
+# update_status() row by row.
+#
+# Runs from `flask sweep-deadlines` (cron) and from a timer thread in each web
+# process. The thread schedules itself from the last recorded run (by any
+# process, cron included) and sleeps until that run is SWEEP_INTERVAL_SECONDS
+# old, so several gunicorn workers don't repeat the work and sweeps stay one
+# interval apart.
+
+STATE_KEY = 'deadline_sweep'
+
+_started_pid = None
+_start_lock = threading.Lock()
+
+
+def init_app(app):
+    # off by default under TESTING (tests and the benchmark), so no thread writes behind their back
+    default = 0 if app.testing else 60 * 60
+    app.config.setdefault('SWEEP_INTERVAL_SECONDS', int(os.environ.get('SWEEP_INTERVAL_SECONDS', default)))  # 0 = off
+    if app.config['SWEEP_INTERVAL_SECONDS']:
+        # started lazily so the thread belongs to the serving (post-fork) process
+        app.before_request(lambda: start_timer(current_app._get_current_object()))
+
+
+def sweep(today=None):
+    """Run the sweep now and commit. Returns the recorded details."""
+    today = today or date.today()
+    updated, inserted = AssignmentSubmission.sweep_overdue(today)
+    details = {'today': today.isoformat(), 'updated': updated, 'inserted': inserted}
+    AppState.put(STATE_KEY, details)
+    db.session.commit()
+    return details
+
+
+def last_run():
+    """(details, finished_at UTC) of the latest sweep, or (None, None)."""
+    return AppState.fetch(STATE_KEY)
+
+
+def seconds_until_due(interval):
+    """How long until the latest sweep is `interval` seconds old (0 when a sweep is due now)."""
+    _, ran_at = last_run()
+    if ran_at is None:
+        return 0
+    return max(0.0, (ran_at + timedelta(seconds=interval) - datetime.utcnow()).total_seconds())
+
+
+def _loop(app):
+    interval = app.config['SWEEP_INTERVAL_SECONDS']
+    while True:
+        with app.app_context():
+            try:
+                wait = seconds_until_due(interval)
+                if not wait:
+                    details = sweep()
+                    app.logger.info("Deadline sweep: %(updated)s updated, %(inserted)s inserted", details)
+                    wait = seconds_until_due(interval)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Deadline sweep failed")
+                wait = interval
+            finally:
+                db.session.remove()
+        time.sleep(wait)
+
+
+def start_timer(app):
+    """Start this process's sweep thread once (again after a fork)."""
+    global _started_pid
+    if _started_pid == os.getpid():
+        return
+    with _start_lock:
+        if _started_pid == os.getpid():
+            return
+        threading.Thread(target=_loop, args=(app,), name='deadline-sweeper', daemon=True).start()
+        _started_pid = os.getpid()
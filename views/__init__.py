@@ -0,0 +1,18 @@
+"""Route blueprints, one per area of the portal.
+
+URLs are unchanged from the single-module app; endpoints are now namespaced by
+blueprint (url_for('attendance.attendance_view') etc.). CLI commands live on
+the blueprint they belong to but are registered at the top level
+(`flask import-students`, not `flask admin import-students`).
+
+Modules that are only needed to produce a download (reportlab, numpy, zipfile,
+the roster reader) are imported inside the views that use them, so creating the
+app doesn't pay for them; benchmark/coldstart.py keeps an eye on that.
+"""
+
+
+def register_blueprints(app):
+    from views import auth, admin, attendance, assignments, announcements, reports
+
+    for module in (auth, admin, attendance, assignments, announcements, reports):
+        app.register_blueprint(module.bp)
@@ -0,0 +1,265 @@
+import click
+from flask import Blueprint, render_template, redirect, url_for, flash, session, request, current_app
+from werkzeug.security import generate_password_hash
+
+from models import (db, Student, Professor, Subject, AttendanceSession, AttendanceRecord, AttendanceSummary,
+                    Assignment, AssignmentSubmission, Announcement, AnnouncementGroup)
+from forms import StudentForm, SubjectForm, ProfessorForm
+import identity
+import refdata
+import sqlite_profile
+
+bp = Blueprint('admin', __name__, cli_group=None)
+
+
+# ------------------ MANAGE STUDENTS ------------------
+@bp.route('/admin/manage_students', methods=['GET', 'POST'])
+def manage_students():
+    form = StudentForm()
+    students = Student.query.all()
+
+    if form.validate_on_submit():
+        student = Student.query.filter_by(roll=form.roll.data).first()
+        if student:
+            student.name = form.name.data
+            student.group = form.group.data
+            student.is_cr = form.is_cr.data
+            if form.password.data:
+                student.password_hash = generate_password_hash(form.password.data)
+            identity.bump()
+            db.session.commit()
+            flash('Student updated successfully!', 'success')
+        else:
+            new_student = Student(
+                name=form.name.data,
+                roll=form.roll.data,
+                group=form.group.data,
+                is_cr=form.is_cr.data,
+                password_hash=generate_password_hash(form.password.data)
+            )
+            db.session.add(new_student)
+            db.session.commit()
+            flash('Student added successfully!', 'success')
+        return redirect(url_for('admin.manage_students'))
+
+    return render_template('manage_students.html', form=form, students=students)
+
+
+@bp.route('/admin/import_students', methods=['POST'])
+def import_students():
+    # bulk roster upload (CSV/XLSX) with the same upsert-by-roll rules as manage_students
+    from roster_import import read_roster, import_roster, RosterError
+
+    if not session.get('admin_username'):
+        flash("Admin login required.", "warning")
+        return redirect(url_for('auth.login_admin'))
+
+    file = request.files.get('roster')
+    if not file or not file.filename:
+        flash("Please choose a roster file.", "danger")
+        return redirect(url_for('admin.manage_students'))
+
+    try:
+        result = import_roster(read_roster(file.stream, file.filename))
+        identity.bump()
+        db.session.commit()
+    except RosterError as e:
+        db.session.rollback()
+        flash(str(e), "danger")
+        return redirect(url_for('admin.manage_students'))
+
+    flash(f"Roster imported: {len(result.created)} created, {len(result.updated)} updated, {len(result.rejected)} rejected.", "success")
+    return render_template('manage_students.html', form=StudentForm(), students=Student.query.all(), import_result=result)
+
+
+@bp.route('/admin/delete_student/<int:student_id>')
+def delete_student(student_id):
+    student = Student.query.get_or_404(student_id)
+    db.session.delete(student)
+    identity.bump()
+    db.session.commit()
+    flash('Student deleted successfully!', 'success')
+    return redirect(url_for('admin.manage_students'))
+
+
+@bp.route('/admin/edit_student/<int:student_id>', methods=['GET', 'POST'])
+def edit_student(student_id):
+    student = Student.query.get_or_404(student_id)
+    form = StudentForm(obj=student)
+    if request.method == 'POST' and form.validate_on_submit():
+        student.name = form.name.data
+        student.roll = form.roll.data
+        student.group = form.group.data
+        student.is_cr = form.is_cr.data
+        if form.password.data:
+            student.password_hash = generate_password_hash(form.password.data)
+        identity.bump()
+        db.session.commit()
+        flash('Student updated successfully!', 'success')
+        return redirect(url_for('admin.manage_students'))
+    return render_template('manage_students.html', form=form, students=Student.query.all())
+
+
+# ------------------ MANAGE SUBJECTS ------------------
+@bp.route('/admin/manage_subjects', methods=['GET', 'POST'])
+def manage_subjects():
+    form = SubjectForm()
+    subjects = Subject.query.all()
+
+    subject_id = request.args.get('subject_id')
+    subject = Subject.query.get(subject_id) if subject_id else None
+
+    if subject and request.method == 'GET':
+        form.name.data = subject.name
+        form.subject_type.data = subject.subject_type
+
+    if form.validate_on_submit():
+        if subject:
+            subject.name = form.name.data
+            subject.subject_type = form.subject_type.data
+            flash('Subject updated successfully!', 'success')
+        else:
+            new_subject = Subject(name=form.name.data, subject_type=form.subject_type.data)
+            db.session.add(new_subject)
+            flash('Subject added successfully!', 'success')
+        refdata.bump()
+        db.session.commit()
+        return redirect(url_for('admin.manage_subjects'))
+
+    return render_template('manage_subjects.html', form=form, subjects=subjects)
+
+
+@bp.route('/admin/delete_subject/<int:subject_id>')
+def delete_subject(subject_id):
+    subject = Subject.query.get_or_404(subject_id)
+    db.session.delete(subject)
+    refdata.bump()
+    db.session.commit()
+    flash('Subject deleted successfully!', 'success')
+    return redirect(url_for('admin.manage_subjects'))
+
+
+@bp.route('/admin/edit_subject/<int:subject_id>')
+def edit_subject(subject_id):
+    return redirect(url_for('admin.manage_subjects', subject_id=subject_id))
+
+
+# ------------------ MANAGE PROFESSORS (Cleaned) ------------------
+@bp.route('/admin/manage_professors', methods=['GET', 'POST'])
+def manage_professors():
+    form = ProfessorForm()
+    professors = Professor.query.all()
+
+    if form.validate_on_submit():
+        prof = Professor.query.filter_by(prof_id=form.prof_id.data).first()
+        if prof:
+            # Update existing professor
+            prof.name = form.name.data
+            if form.password.data:
+                prof.password_hash = generate_password_hash(form.password.data)
+            refdata.bump()
+            identity.bump()
+            db.session.commit()
+            flash('Professor updated successfully!', 'success')
+        else:
+            # Add new professor
+            new_prof = Professor(
+                name=form.name.data,
+                prof_id=form.prof_id.data,
+                password_hash=generate_password_hash(form.password.data)
+            )
+            db.session.add(new_prof)
+            refdata.bump()
+            db.session.commit()
+            flash('Professor added successfully!', 'success')
+
+        return redirect(url_for('admin.manage_professors'))
+
+    return render_template('manage_professors.html', form=form, professors=professors)
+
+
+@bp.route('/admin/delete_professor/<int:professor_id>')
+def delete_professor(professor_id):
+    professor = Professor.query.get_or_404(professor_id)
+    # the professor's sessions (and their records) go with them: take their counts out of the rollup first
+    AttendanceSummary.remove_sessions(AttendanceSession.professor_id == professor.id)
+    db.session.delete(professor)
+    refdata.bump()
+    identity.bump()
+    db.session.commit()
+    flash('Professor deleted successfully!', 'success')
+    return redirect(url_for('admin.manage_professors'))
+
+
+@bp.route('/admin/edit_professor/<int:professor_id>', methods=['GET', 'POST'])
+def edit_professor(professor_id):
+    professor = Professor.query.get_or_404(professor_id)
+    form = ProfessorForm(obj=professor)
+    professors = Professor.query.all()
+
+    if form.validate_on_submit():
+        professor.name = form.name.data
+        professor.prof_id = form.prof_id.data
+        if form.password.data:
+            professor.password_hash = generate_password_hash(form.password.data)
+        refdata.bump()
+        identity.bump()
+        db.session.commit()
+        flash('Professor updated successfully!', 'success')
+        return redirect(url_for('admin.manage_professors'))
+
+    return render_template('manage_professors.html', form=form, professors=professors)
+
+
+@bp.route('/delete_everything')
+def delete_everything():
+    try:
+        # Delete attendance-related data
+        AttendanceSummary.query.delete()
+        AttendanceRecord.query.delete()
+        AttendanceSession.query.delete()
+
+        # Delete assignment-related data
+        AssignmentSubmission.query.delete()
+        Assignment.query.delete()
+
+        # Delete announcements
+        Announcement.query.delete()
+        AnnouncementGroup.query.delete()
+
+        # Commit all changes
+        db.session.commit()
+        flash("✅ All attendance, assignments, and announcements have been deleted successfully.", "success")
+
+    except Exception as e:
+        db.session.rollback()
+        flash(f"⚠️ Error deleting data: {str(e)}", "error")
+
+    return redirect(url_for('auth.dashboard_admin', admin_id=session.get('admin_id')))
+
+
+# ------------------ CLI ------------------
+@bp.cli.command('import-students')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--workers', type=int, default=None, help='Processes used for password hashing (default: CPU count).')
+def import_students_command(path, workers):
+    """Create or update students from a CSV/XLSX roster (columns: roll, name, group, is_cr, password)."""
+    from roster_import import read_roster, import_roster, RosterError
+
+    with open(path, 'rb') as f:
+        try:
+            result = import_roster(read_roster(f, path), workers=workers)
+        except RosterError as e:
+            raise click.ClickException(str(e))
+    identity.bump()
+    db.session.commit()
+    print(f"✅ Created {len(result.created)}, updated {len(result.updated)}, rejected {len(result.rejected)}")
+    for line, roll, reason in result.rejected:
+        print(f"  line {line}: {roll or '-'} — {reason}")
+
+
+@bp.cli.command('sqlite-profile')
+def show_sqlite_profile():
+    """Print the SQLite settings actually in effect on a pooled connection."""
+    for name, value in sqlite_profile.effective_settings(current_app, db).items():
+        print(f"{name}: {value}")
@@ -0,0 +1,131 @@
+import os
+
+from flask import Blueprint, render_template, redirect, url_for, flash, session, request, g, current_app, make_response
+from werkzeug.utils import secure_filename
+
+from models import db, Announcement, AnnouncementGroup
+from attachments import serve_attachment
+from feeds import feed_state, feed_etag, is_not_modified, keyset_page, set_cache_headers
+
+bp = Blueprint('announcements', __name__)
+
+
+@bp.route('/admin/announcement_create', methods=['GET','POST'])
+def announcement_create():
+    # Ensure only admin can access
+    username = session.get('admin_username')
+    if not username:
+        flash("Admin login required.", "warning")
+        return redirect(url_for('auth.login_admin'))
+
+    if request.method == 'POST':
+        title = request.form.get('title')
+        description = request.form.get('description')
+        file = request.files.get('file')
+
+        filename = None
+        if file and file.filename:
+            filename = secure_filename(file.filename)
+            file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+
+        announcement = Announcement(
+            title=title,
+            description=description,
+            filename=filename
+        )
+        db.session.add(announcement)
+        db.session.commit()
+        flash("Announcement posted successfully!", "success")
+        return redirect(url_for('announcements.announcement_create'))
+
+    return render_template('announcement_create.html')
+
+
+@bp.route('/announcement_view')
+def announcement_view():
+    # ?before=<cursor> pages back through older announcements
+    cursor = request.args.get('before')
+    per_page = current_app.config['ANNOUNCEMENTS_PER_PAGE']
+    state = feed_state(Announcement)
+    etag = feed_etag(Announcement, state, cursor, per_page)
+    if is_not_modified(etag, state[0]):
+        return set_cache_headers(make_response('', 304), etag, state[0])
+
+    announcements, next_cursor = keyset_page(Announcement.query, Announcement, cursor, per_page)
+    response = make_response(render_template('announcement_view.html', announcements=announcements, next_cursor=next_cursor))
+    return set_cache_headers(response, etag, state[0])
+
+# Route to download attachments
+@bp.route('/announcement_download/<int:announcement_id>')
+def announcement_download(announcement_id):
+    ann = Announcement.query.get_or_404(announcement_id)
+    if not ann.filename:
+        flash("No file attached.", "warning")
+        return redirect(url_for('announcements.announcement_view'))
+    return serve_attachment(ann.filename)
+# CR: Create group announcement
+@bp.route('/announcement_group_create', methods=['GET', 'POST'])
+def announcement_group_create():
+    if request.method == 'POST':
+        title = request.form['title']
+        description = request.form['description']
+        group = request.form['group']
+        file = request.files.get('file')
+
+        filename = None
+        if file and file.filename:
+            filename = secure_filename(file.filename)
+            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+            file.save(filepath)
+
+        new_announcement = AnnouncementGroup(
+            title=title,
+            description=description,
+            group=group,
+            filename=filename
+        )
+        db.session.add(new_announcement)
+        db.session.commit()
+
+        # ✅ FIXED LINE BELOW
+        return redirect(url_for('announcements.announcement_group_view', group=group))
+
+    return render_template('announcement_group_create.html')
+
+
+# Student: View group announcements for their group only
+@bp.route("/announcement_group_view/<group>")
+def announcement_group_view(group):
+    cursor = request.args.get('before')
+    per_page = current_app.config['ANNOUNCEMENTS_PER_PAGE']
+    state = feed_state(AnnouncementGroup, AnnouncementGroup.group == group)
+    etag = feed_etag(AnnouncementGroup, state, f"{group}|{cursor or ''}", per_page)
+    if is_not_modified(etag, state[0]):
+        return set_cache_headers(make_response('', 304), etag, state[0])
+
+    announcements, next_cursor = keyset_page(
+        AnnouncementGroup.query.filter_by(group=group), AnnouncementGroup, cursor, per_page
+    )
+    response = make_response(render_template("announcement_group_view.html", announcements=announcements, group=group, next_cursor=next_cursor))
+    return set_cache_headers(response, etag, state[0])
+
+
+@bp.route('/announcement_group_download/<int:announcement_id>')
+def announcement_group_download(announcement_id):
+    ann = AnnouncementGroup.query.get_or_404(announcement_id)
+    student = g.student
+    if not student:
+        flash("Please login first.", "warning")
+        return redirect(url_for('auth.login_student'))
+
+    # ensure the student is allowed to download (belong to the group)
+    if ann.group != student.group:
+        flash("You are not authorized to download this file.", "danger")
+        return redirect(url_for('announcements.announcement_group_view', group=student.group))
+
+    if not ann.filename:
+        flash("No attachment for this announcement.", "info")
+        return redirect(url_for('announcements.announcement_group_view', group=ann.group))
+
+    # group attachments are saved to UPLOAD_FOLDER by announcement_group_create
+    return serve_attachment(ann.filename)
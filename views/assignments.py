@@ -0,0 +1,264 @@
+import os
+from datetime import date
+
+import click
+from flask import Blueprint, render_template, redirect, url_for, flash, session, request, g, current_app
+from werkzeug.utils import secure_filename
+
+from models import db, Student, Subject, Assignment, AssignmentSubmission
+from forms import AssignmentCreateForm, AssignmentMarkForm, AssignmentEditForm
+from attachments import serve_attachment
+import archive_cache
+import jobs
+import refdata
+import sweeper
+from views.reports import job_owner
+
+bp = Blueprint('assignments', __name__, cli_group=None)
+
+
+# -------- Create Assignment --------
+@bp.route('/assignments_create', methods=['GET','POST'])
+def assignments_create():
+    form = AssignmentCreateForm()
+
+    # Populate the dropdowns dynamically from the database
+    form.subject.choices = [(s.id, s.name) for s in refdata.subjects()]
+    form.professor.choices = [(p.id, p.name) for p in refdata.professors()]
+
+    if form.validate_on_submit():
+        filename = None
+        if form.document.data:
+            filename = secure_filename(form.document.data.filename)
+            # Save in uploads folder (make sure folder exists)
+            form.document.data.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+
+        new_assignment = Assignment(
+            title=form.title.data,
+            subject_id=form.subject.data,
+            professor_id=form.professor.data,
+            due_date=form.due_date.data,
+            assignment_type=form.assignment_type.data,
+            document=filename
+        )
+        db.session.add(new_assignment)
+        db.session.commit()
+        flash("Assignment created successfully!", "success")
+        return redirect(url_for('assignments.assignments_create'))
+
+    return render_template('assignments_create.html', form=form)
+
+
+
+# -------- Student View Assignments --------
+@bp.route('/assignments_view')
+def assignments_view():
+    student = g.student
+    if not student:
+        flash("Please login as a student.", "warning")
+        return redirect(url_for('auth.login_student'))
+
+    assignments = Assignment.query.order_by(Assignment.due_date.desc()).all()
+    submissions = {sub.assignment_id: sub for sub in AssignmentSubmission.query.filter_by(student_id=student.id).all()}
+
+    return render_template('assignments_view.html', assignments=assignments, submissions=submissions, student=student, today=date.today())
+
+
+@bp.route('/assignments/<int:assignment_id>/upload', methods=['POST'])
+def upload_assignment(assignment_id):
+    student = g.student
+    if not student:
+        flash("Please login as a student.", "warning")
+        return redirect(url_for('auth.login_student'))
+
+    assignment = Assignment.query.get_or_404(assignment_id)
+
+    if 'file' not in request.files:
+        flash("No file part in request.", "danger")
+        return redirect(url_for('assignments.assignments_view'))
+
+    file = request.files['file']
+    if file.filename == '':
+        flash("No file selected.", "danger")
+        return redirect(url_for('assignments.assignments_view'))
+
+    # Save file in uploads folder
+    filename = secure_filename(f"{student.roll}_{assignment.id}_{file.filename}")
+    file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+    file.save(file_path)
+
+    # Record in database
+    submission = AssignmentSubmission.query.filter_by(
+        assignment_id=assignment.id, student_id=student.id
+    ).first()
+
+    if not submission:
+        submission = AssignmentSubmission(
+            assignment_id=assignment.id,
+            student_id=student.id,
+            submission_file=file_path,
+            status="Submitted"
+        )
+        db.session.add(submission)
+    else:
+        # Update existing submission
+        submission.submission_file = file_path
+        submission.status = "Submitted"
+
+    db.session.commit()
+    flash("Assignment uploaded successfully!", "success")
+    return redirect(url_for('assignments.assignments_view'))
+
+
+
+@bp.route('/assignments_edit', methods=['GET', 'POST'])
+def assignments_edit():
+    form = AssignmentEditForm()
+    professors = refdata.professors()
+    subjects = []
+    assignments = []
+    students = []
+
+    selected_professor_id = request.form.get('professor_id', type=int)
+    selected_subject_id = request.form.get('subject_id', type=int)
+    selected_assignment_id = request.form.get('assignment_id', type=int)
+
+    # If professor selected, populate subjects and assignments
+    if selected_professor_id:
+        # Subjects for this professor's offline assignments
+        subjects = Subject.query.join(Assignment).filter(
+            Assignment.professor_id == selected_professor_id,
+            Assignment.assignment_type == 'Offline'
+        ).distinct().all()
+
+        # Assignments for this professor
+        assignments = Assignment.query.filter_by(
+            professor_id=selected_professor_id,
+            assignment_type='Offline'
+        ).all()
+
+    # If assignment selected, populate students and their status
+    if selected_assignment_id:
+        assignment = Assignment.query.get(selected_assignment_id)
+        students = Student.query.order_by(Student.roll).all()
+        # attach status for each student
+        statuses = AssignmentSubmission.statuses_for(assignment.id)
+        for s in students:
+            s.status = statuses.get(s.id, 'Pending')
+
+    # Handle update of statuses
+    if request.method == 'POST' and 'update' in request.form:
+        assignment_id = selected_assignment_id
+        assignment = Assignment.query.get(assignment_id)
+        AssignmentSubmission.bulk_set_statuses(
+            assignment.id,
+            {s.id: request.form.get(f'status_{s.id}') for s in students}
+        )
+        db.session.commit()
+        flash("Statuses updated successfully!", "success")
+        return redirect(url_for('assignments.assignments_edit'))
+
+    return render_template(
+        'assignments_edit.html',
+        form=form,
+        professors=professors,
+        subjects=subjects,
+        assignments=assignments,
+        students=students,
+        selected_professor_id=selected_professor_id,
+        selected_subject_id=selected_subject_id,
+        selected_assignment_id=selected_assignment_id
+    )
+
+
+# -------- Offline Assignment Marking by CR --------
+@bp.route('/assignments_mark', methods=['GET','POST'])
+def assignments_mark():
+    form = AssignmentMarkForm()
+    form.professor.choices = [(p.id, p.name) for p in refdata.professors()]
+    form.assignment.choices = []
+
+    assignments = []  # <-- initialize here
+    selected_prof_id = None
+    selected_assignment = None
+    students = []
+
+    if request.method == 'POST':
+        prof_val = request.form.get('professor')
+        assign_val = request.form.get('assignment')
+
+        # Only convert to int if value is not empty
+        if prof_val:
+            selected_prof_id = int(prof_val)
+            assignments = Assignment.query.filter_by(professor_id=selected_prof_id, assignment_type='Offline').all()
+            form.assignment.choices = [(a.id, a.title) for a in assignments]
+
+        if assign_val:
+            assignment_id = int(assign_val)
+            selected_assignment = Assignment.query.get(assignment_id)
+            students = Student.query.all()
+            # Attach current status for each student
+            statuses = AssignmentSubmission.statuses_for(assignment_id)
+            for s in students:
+                s.status = statuses.get(s.id, 'Pending')
+
+        # Update statuses
+        if 'update' in request.form and selected_assignment:
+            AssignmentSubmission.bulk_set_statuses(
+                selected_assignment.id,
+                {s.id: request.form.get(f'status_{s.id}') for s in students}
+            )
+            db.session.commit()
+            flash("Statuses updated successfully!", "success")
+            return redirect(url_for('assignments.assignments_mark'))
+
+    return render_template('assignments_mark.html', form=form, professors=form.professor.choices,
+                           assignments=assignments, students=students,
+                           selected_prof_id=selected_prof_id, selected_assignment=selected_assignment)
+
+
+# -------- Assignment Responses (Download ZIP) --------
+@bp.route('/assignments_response', methods=['GET','POST'])
+def assignments_response():
+    professors = refdata.professors()
+    selected_professor_id = request.form.get('professor_id', type=int)
+    selected_assignment_id = request.form.get('assignment_id', type=int)
+    selected_assignment = None
+    assignments = []
+
+    # Populate assignments based on professor
+    if selected_professor_id:
+        assignments = Assignment.query.filter_by(professor_id=selected_professor_id).order_by(Assignment.title).all()
+
+    # If download requested
+    if request.method == 'POST' and selected_assignment_id:
+        selected_assignment = Assignment.query.get(selected_assignment_id)
+        submissions = AssignmentSubmission.query.filter_by(assignment_id=selected_assignment_id).all()
+
+        # cached per assignment and only rebuilt/extended when submissions change
+        # (file names already carry the student roll prefix); anything but a cache
+        # hit is built by a background job so the worker isn't held up
+        if archive_cache.is_fresh(selected_assignment.id, submissions):
+            return serve_attachment(archive_cache.archive_name(selected_assignment.id),
+                                    directory=current_app.config['ARCHIVE_CACHE_DIR'])
+        job = jobs.enqueue('assignment_zip', {'assignment_id': selected_assignment.id}, owner=job_owner())
+        return redirect(url_for('reports.job_status', job_id=job.id), code=303)
+
+    return render_template(
+        'assignments_response.html',
+        professors=professors,
+        assignments=assignments,
+        selected_professor_id=selected_professor_id,
+        selected_assignment_id=selected_assignment_id,
+        selected_assignment=selected_assignment,
+        role='professor' if 'prof_id' in session else 'admin'
+    )
+
+
+# ------------------ CLI ------------------
+@bp.cli.command('sweep-deadlines')
+@click.option('--today', type=click.DateTime(['%Y-%m-%d']), default=None, help='Pretend it is this date.')
+def sweep_deadlines(today):
+    """Mark every submission past its due date as Missed (including students with no row yet)."""
+    details = sweeper.sweep(today.date() if today else None)
+    print(f"✅ Deadline sweep: {details['updated']} rows marked Missed, {details['inserted']} Missed rows added")
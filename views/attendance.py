@@ -0,0 +1,297 @@
+from datetime import datetime
+
+from flask import Blueprint, render_template, redirect, url_for, flash, session, request, g, make_response
+from sqlalchemy.orm import contains_eager, joinedload
+from werkzeug.utils import secure_filename
+
+from models import db, Student, Subject, AttendanceSession, AttendanceRecord, AttendanceSummary
+from query_budget import query_budget as budget
+import exports
+import refdata
+import jobs
+from views.reports import job_owner
+
+bp = Blueprint('attendance', __name__, cli_group=None)
+
+
+# ----------------------------
+# STUDENT: View Attendance
+# ----------------------------
+# Route for students (uses current logged-in student roll from session).
+# Admins can open /attendance/view/<int:student_id> to view specific student.
+@bp.route('/attendance/view')
+@bp.route('/attendance/view/<int:student_id>')
+@budget(4)
+def attendance_view(student_id=None):
+    # if student_id provided (admin/prof access), use it; otherwise use logged-in student
+    if student_id is None:
+        if not session.get('student_roll'):
+            flash("Please login as a student to view attendance.", "warning")
+            return redirect(url_for('auth.login_student'))
+        student = g.student
+    elif g.student and g.student.id == student_id:
+        student = g.student
+    else:
+        student = Student.query.get_or_404(student_id)
+
+    # gather student's attendance records joined with session (and its subject, used per row)
+    records = (
+        AttendanceRecord.query
+        .filter_by(student_id=student.id)
+        .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+        .options(contains_eager(AttendanceRecord.session).joinedload(AttendanceSession.subject))
+        .order_by(AttendanceSession.date.desc())
+        .all()
+    )
+    return render_template('attendance_view.html', student=student, records=records)
+
+
+# ----------------------------
+# CR: Mark / Upload Attendance
+# ----------------------------
+# CR visits /attendance/mark and we identify CR from session['student_roll'] (or cr_id param)
+@bp.route('/attendance/mark', methods=['GET', 'POST'])
+@bp.route('/attendance/mark/<int:cr_id>', methods=['GET', 'POST'])
+def attendance_mark(cr_id=None):
+    # identify CR user
+    if cr_id and not (g.student and g.student.id == cr_id):
+        cr = Student.query.get_or_404(cr_id)
+    else:
+        if not session.get('student_roll'):
+            flash("Please login as CR to mark attendance.", "warning")
+            return redirect(url_for('auth.login_student'))
+        cr = g.student
+
+    if not cr or not cr.is_cr:
+        flash("Only CRs can upload attendance from this page.", "danger")
+        return redirect(url_for('auth.dashboard_student'))
+
+    professors = refdata.professors()
+    subjects = refdata.subjects()
+
+    # default students listing (all students). We'll filter by group when processing form
+    students = Student.query.order_by(Student.roll).all()
+
+    if request.method == 'POST':
+        # read form fields
+        try:
+            subject_id = int(request.form['subject'])
+        except Exception:
+            flash("Please select a valid subject.", "danger")
+            return redirect(request.url)
+
+        try:
+            professor_id = int(request.form['professor'])
+        except Exception:
+            flash("Please select a valid professor.", "danger")
+            return redirect(request.url)
+
+        date_str = request.form.get('date')
+        if not date_str:
+            flash("Please select a date.", "danger")
+            return redirect(request.url)
+
+        try:
+            date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
+        except ValueError:
+            flash("Invalid date format.", "danger")
+            return redirect(request.url)
+
+        subject_type = request.form.get('subject_type', '').strip()
+        group_choice = request.form.get('group_choice', 'ALL')  # A / B / ALL
+
+        # selected present students (posted as list of student ids)
+        present_ids = request.form.getlist('present_students')
+        present_ids = set([int(x) for x in present_ids]) if present_ids else set()
+
+        # Reuse the session for the same subject/professor/date/group, or create it
+        # (safe against two CRs submitting the same new session at once)
+        session_obj = AttendanceSession.for_slot(
+            subject_id, professor_id, date_obj, group_choice,
+            subject_type=subject_type,
+            recorded_by_cr_id=cr.id,
+        )
+
+        # determine student list to record for (respecting group_choice and subject_type)
+        if subject_type.lower() == 'practical' and group_choice in ('A', 'B'):
+            students_to_mark = Student.query.filter_by(group=group_choice).all()
+        else:
+            students_to_mark = Student.query.all()
+
+        # write only the records whose status changed, together with the rollup, in one transaction
+        deltas = session_obj.mark_students(students_to_mark, present_ids)
+        AttendanceSummary.apply_deltas(session_obj.subject_id, deltas)
+        db.session.commit()
+
+        flash('Attendance uploaded successfully.', 'success')
+        return redirect(url_for('attendance.attendance_mark', cr_id=cr.id))
+
+    # GET -> render form
+    return render_template('attendance_mark.html', cr=cr, professors=professors, subjects=subjects, students=students)
+
+
+# ----------------------------
+# PROFESSOR: Attendance Report (search & PDF download)
+# ----------------------------
+@bp.route('/attendance/report', methods=['GET', 'POST'])
+@budget(4 + refdata.REFRESH_QUERIES)
+def attendance_report():
+    matched_sessions = []
+
+    def render():
+        # the dropdown lists are only needed on the page itself, not for the download redirect
+        return render_template('attendance_report.html', professors=refdata.professors(),
+                               subjects=refdata.subjects(), sessions=matched_sessions)
+
+    if request.method == 'POST':
+        professor_id = request.form.get('professor')
+        subject_id = request.form.get('subject')
+        date_str = request.form.get('date')
+        subject_type = request.form.get('subject_type')
+
+        # basic validation
+        try:
+            professor_id = int(professor_id)
+            subject_id = int(subject_id)
+            date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
+        except Exception:
+            flash("Please select valid professor, subject and date.", "danger")
+            return render()
+
+        # If download requested -> render the PDF in the background and send the user to the job page
+        # (the job looks the sessions up itself)
+        if 'download' in request.form:
+            job = jobs.enqueue('attendance_pdf', {
+                'professor_id': professor_id,
+                'subject_id': subject_id,
+                'date': date_obj.isoformat(),
+                'subject_type': subject_type,
+            }, owner=job_owner())
+            return redirect(url_for('reports.job_status', job_id=job.id), code=303)
+
+        matched_sessions = exports.find_report_sessions(professor_id, subject_id, date_obj, subject_type)
+
+    return render()
+
+
+# ----------------------------
+# PROFESSOR: Attendance Register (students x sessions)
+# ----------------------------
+@bp.route('/attendance/register')
+def attendance_register():
+    # numpy loads on first use, not when a worker boots
+    from register import build_register, to_csv as register_csv, CELL_TEXT
+
+    if not (session.get('prof_id') or session.get('admin_username')):
+        flash("Please login as a professor or admin to view the register.", "warning")
+        return redirect(url_for('auth.login_professor'))
+
+    subjects = refdata.subjects()
+    selected_subject = None
+    register = None
+    try:
+        filters = {
+            'date_from': datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else None,
+            'date_to': datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else None,
+            'group': request.args.get('group') or None,
+        }
+    except ValueError:
+        flash("Please pick valid dates.", "danger")
+        filters = {'date_from': None, 'date_to': None, 'group': None}
+
+    subject_id = request.args.get('subject', type=int)
+    if subject_id:
+        selected_subject = Subject.query.get_or_404(subject_id)
+        fmt = request.args.get('format', 'html')
+        if fmt == 'pdf':
+            # rendered by the export workers, like the other PDFs
+            job = jobs.enqueue('register_pdf', {
+                'subject_id': subject_id,
+                'date_from': filters['date_from'].isoformat() if filters['date_from'] else None,
+                'date_to': filters['date_to'].isoformat() if filters['date_to'] else None,
+                'group': filters['group'],
+            }, owner=job_owner())
+            return redirect(url_for('reports.job_status', job_id=job.id), code=303)
+
+        register = build_register(subject_id, **filters)
+        if fmt == 'csv':
+            response = make_response(register_csv(register))
+            response.mimetype = 'text/csv'
+            response.headers['Content-Disposition'] = f'attachment; filename="register_{secure_filename(selected_subject.name)}.csv"'
+            return response
+
+    def export_url(fmt):
+        return url_for('attendance.attendance_register', **{**request.args.to_dict(), 'format': fmt})
+
+    return render_template('attendance_register.html', subjects=subjects, selected_subject=selected_subject,
+                           register=register, filters=filters, export_url=export_url,
+                           cell_text=CELL_TEXT)
+
+
+# ----------------------------
+# ADMIN: Edit Attendance
+# ----------------------------
+@bp.route('/attendance/edit', methods=['GET', 'POST'])
+def attendance_edit():
+    # only allow access if logged-in admin
+    username = session.get('admin_username')
+    if not username:
+        flash("Admin login required.", "warning")
+        return redirect(url_for('auth.login_admin'))
+
+    professors = refdata.professors()
+    subjects = refdata.subjects()
+    records = []
+    session_obj = None
+
+    if request.method == 'POST':
+        # first button click to search session
+        if 'search' in request.form:
+            try:
+                professor_id = int(request.form.get('professor'))
+                subject_id = int(request.form.get('subject'))
+                date_obj = datetime.strptime(request.form.get('date'), '%Y-%m-%d').date()
+            except Exception:
+                flash("Please provide valid professor, subject and date.", "danger")
+                return render_template('attendance_edit.html', professors=professors, subjects=subjects, records=records)
+
+            session_obj = AttendanceSession.query.filter_by(
+                professor_id=professor_id,
+                subject_id=subject_id,
+                date=date_obj
+            ).first()
+
+            if not session_obj:
+                flash("No attendance session found for the given details.", "info")
+            else:
+                records = AttendanceRecord.query.filter_by(session_id=session_obj.id).options(joinedload(AttendanceRecord.student)).all()
+
+            return render_template('attendance_edit.html', professors=professors, subjects=subjects, records=records, session=session_obj)
+
+        # update button to save edited statuses
+        if 'update' in request.form:
+            session_id = int(request.form.get('session_id'))
+            session_obj = AttendanceSession.query.get_or_404(session_id)
+            deltas = {}
+            for rec in session_obj.records:
+                new_val = request.form.get(f'status_{rec.id}')
+                present = True if new_val == 'Present' else False
+                if present != rec.present:
+                    deltas[rec.student_id] = (1 if present else -1, 0)
+                rec.present = present
+            AttendanceSummary.apply_deltas(session_obj.subject_id, deltas)
+            db.session.commit()
+            flash("Attendance updated successfully.", "success")
+            return redirect(url_for('attendance.attendance_edit'))
+
+    return render_template('attendance_edit.html', professors=professors, subjects=subjects, records=records, session=session_obj)
+
+
+# ------------------ CLI ------------------
+@bp.cli.command('rebuild-attendance-summary')
+def rebuild_attendance_summary():
+    """Recreate the attendance rollup table from the raw attendance records."""
+    db.create_all()
+    rows = AttendanceSummary.rebuild()
+    db.session.commit()
+    print(f"✅ Rebuilt attendance summary: {rows} rows")
@@ -0,0 +1,107 @@
+from flask import Blueprint, render_template, redirect, url_for, flash, session, g
+
+from models import Student, Professor, Admin, Assignment, AssignmentSubmission, AttendanceSummary
+from forms import StudentLoginForm, ProfessorLoginForm, AdminLoginForm
+import sweeper
+
+bp = Blueprint('auth', __name__)
+
+
+# ------------------ HOME ------------------
+@bp.route('/')
+def home():
+    return redirect(url_for('auth.login_student'))
+
+
+# ------------------ STUDENT LOGIN ------------------
+@bp.route('/login_student', methods=['GET', 'POST'])
+def login_student():
+    form = StudentLoginForm()
+    if form.validate_on_submit():
+        student = Student.query.filter_by(roll=form.roll.data).first()
+        if student and student.check_password(form.password.data):
+            session['student_roll'] = student.roll
+            return redirect(url_for('auth.dashboard_student'))
+        else:
+            flash("Invalid credentials", "danger")
+    return render_template('login_student.html', form=form)
+
+
+@bp.route('/dashboard_student')
+def dashboard_student():
+    if not session.get('student_roll'):
+        return redirect(url_for('auth.login_student'))
+
+    student = g.student
+    if not student:
+        flash("Student not found.", "danger")
+        return redirect(url_for('auth.login_student'))
+
+    # --- Attendance Stats ---
+    attended_classes, total_classes = AttendanceSummary.totals_for_student(student.id)
+    attendance_percentage = round((attended_classes / total_classes) * 100, 1) if total_classes > 0 else 0
+
+    # --- Assignment Stats ---
+    total_assignments = Assignment.query.count()
+    completed_assignments = AssignmentSubmission.query.filter_by(student_id=student.id, status='Submitted').count()
+
+    return render_template(
+        'dashboard_student.html',
+        student=student,
+        attendance_percentage=attendance_percentage,
+        attended_classes=attended_classes,
+        total_classes=total_classes,
+        completed_assignments=completed_assignments,
+        total_assignments=total_assignments
+    )
+
+
+
+# ------------------ PROFESSOR LOGIN ------------------
+@bp.route('/login_professor', methods=['GET', 'POST'])
+def login_professor():
+    form = ProfessorLoginForm()
+    if form.validate_on_submit():
+        prof = Professor.query.filter_by(prof_id=form.prof_id.data).first()
+        if prof and prof.check_password(form.password.data):
+            session['prof_id'] = prof.prof_id
+            return redirect(url_for('auth.dashboard_professor'))
+        else:
+            flash("Invalid credentials", "danger")
+    return render_template('login_professor.html', form=form)
+
+
+@bp.route('/dashboard_professor')
+def dashboard_professor():
+    if not session.get('prof_id'):
+        return redirect(url_for('auth.login_professor'))
+    return render_template('dashboard_professor.html', professor=g.professor)
+
+
+# ------------------ ADMIN LOGIN ------------------
+@bp.route('/login_admin', methods=['GET', 'POST'])
+def login_admin():
+    form = AdminLoginForm()
+    if form.validate_on_submit():
+        admin = Admin.query.filter_by(username=form.username.data).first()
+        if admin and admin.check_password(form.password.data):
+            session['admin_username'] = admin.username
+            return redirect(url_for('auth.dashboard_admin'))
+        else:
+            flash("Invalid credentials", "danger")
+    return render_template('login_admin.html', form=form)
+
+
+@bp.route('/dashboard_admin')
+def dashboard_admin():
+    if not session.get('admin_username'):
+        return redirect(url_for('auth.login_admin'))
+    last_sweep, last_sweep_at = sweeper.last_run()
+    return render_template('dashboard_admin.html', admin=g.admin, last_sweep=last_sweep, last_sweep_at=last_sweep_at)
+
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    flash("Logged out successfully.", "info")
+    return redirect(url_for('auth.login_student'))
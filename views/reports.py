@@ -0,0 +1,225 @@
+from datetime import datetime
+
+import click
+from flask import (Blueprint, Response, render_template, redirect, url_for, flash, session, request, current_app,
+                   abort, jsonify, stream_with_context)
+
+from models import db, Student, ExportJob
+from attachments import serve_attachment
+from query_budget import query_budget as budget
+from reporting import student_report, class_report, defaulters, DEFAULT_THRESHOLD
+import exports
+import jobs
+import refdata
+
+bp = Blueprint('reports', __name__, cli_group=None)
+
+
+# ----------------------------
+# PROFESSOR: Student Reports
+# ----------------------------
+@bp.route('/reports', methods=['GET', 'POST'])
+def reports():
+    # only accessible to logged-in professors
+    prof_id = session.get('prof_id')
+    if not prof_id:
+        flash("Please login as a professor to view reports.", "warning")
+        return redirect(url_for('auth.login_professor'))
+
+    # all students to populate dropdown
+    students = Student.query.order_by(Student.roll).all()
+    selected_student = None
+
+    # overall summaries
+    attendance_summary = None
+    assignment_summary = None
+
+    # per-subject breakdown lists
+    per_subject_attendance = []    # list of dicts: {subject_id, subject_name, present, total}
+    per_subject_assignments = []   # list of dicts: {subject_id, subject_name, submitted, total}
+
+    if request.method == 'POST':
+        try:
+            student_id = int(request.form.get('student_id'))
+        except Exception:
+            flash("Please select a valid student.", "danger")
+            return render_template('reports.html', students=students)
+
+        selected_student = Student.query.get_or_404(student_id)
+
+        report = student_report(selected_student.id)
+        attendance_summary = report['attendance_summary']
+        assignment_summary = report['assignment_summary']
+        per_subject_attendance = report['per_subject_attendance']
+        per_subject_assignments = report['per_subject_assignments']
+
+    return render_template(
+        'reports.html',
+        students=students,
+        selected_student=selected_student,
+        attendance_summary=attendance_summary,
+        assignment_summary=assignment_summary,
+        per_subject_attendance=per_subject_attendance,
+        per_subject_assignments=per_subject_assignments
+    )
+
+
+@bp.route('/reports/class')
+def reports_class():
+    # whole-cohort matrix (students x subjects) for professors
+    prof_id = session.get('prof_id')
+    if not prof_id:
+        flash("Please login as a professor to view reports.", "warning")
+        return redirect(url_for('auth.login_professor'))
+
+    subjects, rows = class_report()
+    return render_template('reports_class.html', subjects=subjects, rows=rows)
+
+
+def wants_json():
+    return request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json'
+
+
+@bp.route('/reports/defaulters')
+@budget(3 + refdata.REFRESH_QUERIES)
+def reports_defaulters():
+    # students under the attendance threshold; ?subject=<id>&group=A|B&threshold=75, JSON with ?format=json
+    if not (session.get('prof_id') or session.get('admin_username')):
+        flash("Please login as a professor or admin to view defaulters.", "warning")
+        return redirect(url_for('auth.login_professor'))
+    threshold = request.args.get('threshold', DEFAULT_THRESHOLD, type=float)
+    if not 0 < threshold <= 100:
+        abort(400)
+    subject_id = request.args.get('subject', type=int)
+    group = request.args.get('group') or None
+    rows = defaulters(threshold, subject_id=subject_id, group=group)
+
+    if wants_json():
+        response = jsonify({
+            'threshold': threshold,
+            'subject_id': subject_id,
+            'group': group,
+            'defaulters': [{
+                'student_id': r['student'].id,
+                'roll': r['student'].roll,
+                'name': r['student'].name,
+                'group': r['student'].group,
+                'subject_id': r['subject_id'],
+                'subject': r['subject_name'],
+                'attended': r['attended'],
+                'total': r['total'],
+                'percent': r['percent'],
+                'classes_needed': r['classes_needed'],
+            } for r in rows],
+        })
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    json_url = url_for('reports.reports_defaulters', **{**request.args.to_dict(), 'format': 'json'})
+    return render_template('reports_defaulters.html', rows=rows, threshold=threshold, subject_id=subject_id,
+                           group=group, subjects=refdata.subjects(), json_url=json_url)
+
+
+# ----------------------------
+# Raw data exports (streamed CSV / NDJSON)
+# ----------------------------
+@bp.route('/exports/<dataset>.<fmt>')
+def export_data(dataset, fmt):
+    # professors and admins only; filters: ?from=YYYY-MM-DD&to=...&subject=<id>&professor=<id>&group=A|B
+    if not (session.get('prof_id') or session.get('admin_username')):
+        flash("Please login as a professor or admin to export data.", "warning")
+        return redirect(url_for('auth.login_professor'))
+    if dataset not in exports.DATASETS or fmt not in exports.FORMATS:
+        abort(404)
+    try:
+        filters = {
+            'date_from': datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else None,
+            'date_to': datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else None,
+            'subject_id': request.args.get('subject', type=int),
+            'professor_id': request.args.get('professor', type=int),
+            'group': request.args.get('group') or None,
+        }
+    except ValueError:
+        abort(400)
+
+    response = Response(stream_with_context(exports.iter_export(dataset, fmt, **filters)),
+                        mimetype=exports.FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{dataset}.{fmt}"'
+    response.headers['X-Accel-Buffering'] = 'no'   # let nginx pass chunks straight through
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+# ----------------------------
+# Export jobs (status polling & download)
+# ----------------------------
+def job_owner():
+    # whoever queued the export is the only one who can poll/download it
+    if session.get('prof_id'):
+        return f"professor:{session['prof_id']}"
+    if session.get('admin_username'):
+        return f"admin:{session['admin_username']}"
+    if session.get('student_roll'):
+        return f"student:{session['student_roll']}"
+    return None
+
+
+def get_owned_job(job_id):
+    job = db.session.get(ExportJob, job_id)
+    if job is None or job.owner != job_owner():
+        abort(404)
+    return job
+
+
+@bp.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = get_owned_job(job_id)
+    state = {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'message': job.message,
+        'download_url': url_for('reports.job_download', job_id=job.id) if job.status == 'done' else None,
+    }
+    if wants_json():
+        response = jsonify(state)
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    return render_template('job_status.html', job=state)
+
+
+@bp.route('/jobs/<job_id>/download')
+def job_download(job_id):
+    job = get_owned_job(job_id)
+    if job.status != 'done':
+        abort(404)
+    return serve_attachment(job.result_file, download_name=job.download_name,
+                            directory=current_app.config['EXPORT_DIR'])
+
+
+# ------------------ CLI ------------------
+@bp.cli.command('export-data')
+@click.argument('dataset', type=click.Choice(sorted(exports.DATASETS)))
+@click.option('--format', 'fmt', type=click.Choice(sorted(exports.FORMATS)), default='csv')
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-', help='File to write (default: stdout).')
+@click.option('--from', 'date_from', type=click.DateTime(['%Y-%m-%d']), default=None)
+@click.option('--to', 'date_to', type=click.DateTime(['%Y-%m-%d']), default=None)
+@click.option('--subject', 'subject_id', type=int, default=None)
+@click.option('--professor', 'professor_id', type=int, default=None)
+@click.option('--group', type=click.Choice(['A', 'B']), default=None)
+def export_data_command(dataset, fmt, output, date_from, date_to, subject_id, professor_id, group):
+    """Stream raw attendance or submission rows as CSV/NDJSON."""
+    for chunk in exports.iter_export(
+        dataset, fmt,
+        date_from=date_from.date() if date_from else None,
+        date_to=date_to.date() if date_to else None,
+        subject_id=subject_id, professor_id=professor_id, group=group,
+    ):
+        output.write(chunk)
+
+
+@bp.cli.command('run-jobs')
+@click.option('--once', is_flag=True, help='Exit when the queue is empty instead of polling.')
+def run_jobs(once):
+    """Run the export job worker loop in this process (instead of or alongside the web workers' threads)."""
+    jobs.work(current_app._get_current_object(), once=once)